@@ -4,8 +4,19 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 import os
-from main import ArabicAudioTranscriber, load_device_config, save_device_config, require_dependencies
-import soundcard as sc
+from main import (
+    ArabicAudioTranscriber,
+    HAS_CTRANSLATE2,
+    HAS_FASTER_WHISPER,
+    get_audio_devices,
+    load_ct2_translator,
+    load_device_config,
+    load_faster_whisper,
+    load_torch_translator,
+    preload_imports,
+    save_device_config,
+    require_dependencies,
+)
 
 
 CONFIG_FILE = "config.ini"
@@ -77,6 +88,7 @@ def hide_console_window():
 def gui_main():
     hide_console_window()
     require_dependencies()
+    preload_imports()
 
     root = tk.Tk()
     root.title("Desktop Audio Translator")
@@ -156,7 +168,7 @@ def gui_main():
     def refresh_devices():
         nonlocal devices
         try:
-            devices = sc.all_microphones(include_loopback=True)
+            devices = get_audio_devices(refresh=True)
         except Exception as e:
             messagebox.showerror("Error", f"Unable to list devices: {e}")
             devices = []
@@ -233,8 +245,14 @@ def gui_main():
                 os.environ.pop("HF_HUB_OFFLINE", None)
                 os.environ.pop("TRANSFORMERS_OFFLINE", None)
                 from transformers import pipeline
-                _asr = pipeline("automatic-speech-recognition", model=whisper_model, device=-1)
-                _tr = pipeline("translation", model=model_name, device=-1)
+                if HAS_FASTER_WHISPER:
+                    _asr = load_faster_whisper(whisper_model)
+                else:
+                    _asr = pipeline("automatic-speech-recognition", model=whisper_model, device=-1)
+                if HAS_CTRANSLATE2:
+                    _tr = load_ct2_translator(model_name)
+                else:
+                    _tr = load_torch_translator(model_name)
                 _ = _asr
                 _ = _tr
                 set_status("Downloaded")
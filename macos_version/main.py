@@ -4,6 +4,7 @@ Arabic Desktop Audio Transcriber and Translator
 Captures desktop audio, transcribes Arabic speech, and translates to English
 """
 
+import asyncio
 import warnings
 warnings.filterwarnings("ignore")
 warnings.filterwarnings("ignore", message=r"`return_token_timestamps` is deprecated.*", category=FutureWarning)
@@ -12,55 +13,297 @@ import json
 from datetime import datetime
 import os
 import atexit
-import keyboard
-import configparser
 import platform
+import select
 import signal
 import socket
+
+# Leave a couple of cores for audio capture; OpenMP reads this once, so it must be set before torch loads
+try:
+    MODEL_THREADS = max(1, int(os.environ.get("MODEL_THREADS", str((os.cpu_count() or 1) - 2)).strip()))
+except ValueError:
+    MODEL_THREADS = max(1, (os.cpu_count() or 1) - 2)
+# ASR and translation run at the same time, so they split the budget instead of each taking all of it
+MT_THREADS = max(1, MODEL_THREADS // 2)  # torch: the translator and the transformers-Whisper fallback
+ASR_THREADS = max(1, MODEL_THREADS - MT_THREADS)  # faster-whisper
+os.environ.setdefault("OMP_NUM_THREADS", str(MT_THREADS))
+
+# Linux only: reserve the last core for the capture thread. Threads inherit their creator's
+# affinity, so restricting the main thread now keeps every later model thread off that core.
+CAPTURE_CORE = None
+MODEL_CORES = None
+if hasattr(os, "sched_setaffinity"):
+    allowed_cores = os.sched_getaffinity(0)
+    if len(allowed_cores) > MODEL_THREADS:
+        try:
+            os.sched_setaffinity(0, allowed_cores - {max(allowed_cores)})
+            CAPTURE_CORE = max(allowed_cores)
+            MODEL_CORES = allowed_cores - {CAPTURE_CORE}
+        except OSError:
+            pass
+
 import torch
 import pyaudio
 import numpy as np
-import speech_recognition as sr
 from transformers import pipeline
 import threading
 import queue
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import NamedTuple
+
+try:
+    import speech_recognition as sr
+except ImportError:
+    sr = None
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    sd = None
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+torch.set_num_threads(MT_THREADS)
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    pass  # Already fixed once inter-op work has started
+
+# Recognition errors raised by the Google backends (stand-ins when SpeechRecognition is missing,
+# so the except clauses in transcribe_chunk still work with Whisper alone)
+if sr is not None:
+    UnknownValueError = sr.UnknownValueError
+    RequestError = sr.RequestError
+else:
+    class UnknownValueError(Exception):
+        """No speech could be recognized"""
+
+    class RequestError(Exception):
+        """The recognition service could not be reached"""
+
+GOOGLE_ASR_BACKENDS = ("google", "google_web", "google_cloud")
+
+class TranscriptEntry(NamedTuple):
+    """One transcribed and translated utterance (a plain tuple: no per-instance __dict__)"""
+    timestamp: str
+    arabic_text: str
+    english_text: str
+
+# Google web speech endpoint used by SpeechRecognition's recognize_google
+GOOGLE_SPEECH_URL = "http://www.google.com/speech-api/v2/recognize"
 
 # Configuration file path
-CONFIG_FILE = "config.ini"
+CONFIG_FILE = "config.json"
+LEGACY_CONFIG_FILE = "config.ini"
 
 def load_device_config():
-    """Load saved device configuration"""
-    config = configparser.ConfigParser()
-    if os.path.exists(CONFIG_FILE):
-        config.read(CONFIG_FILE)
-        if 'DEVICE' in config and 'name' in config['DEVICE']:
-            return config['DEVICE']['name']
-    return None
+    """Load saved device configuration as {"name", "index", "host_api"} (empty dict if none)"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            return config if isinstance(config, dict) else {}
+        if os.path.exists(LEGACY_CONFIG_FILE):
+            # Older versions stored only the device name in an INI file
+            import configparser
+            legacy = configparser.ConfigParser()
+            legacy.read(LEGACY_CONFIG_FILE)
+            if 'DEVICE' in legacy and 'name' in legacy['DEVICE']:
+                return {"name": legacy['DEVICE']['name']}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not read {CONFIG_FILE}: {e}")
+    return {}
 
-def save_device_config(device_name):
-    """Save device configuration"""
-    config = configparser.ConfigParser()
-    config['DEVICE'] = {'name': device_name}
-    with open(CONFIG_FILE, 'w') as f:
-        config.write(f)
-    print(f"Device '{device_name}' saved as default.")
+def save_device_config(device_info):
+    """Save device configuration, caching the PyAudio index so the next startup can skip enumeration"""
+    config = {
+        "name": device_info['name'],
+        "index": device_info.get('index'),
+        "host_api": device_info.get('hostApi'),
+    }
+    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    print(f"Device '{device_info['name']}' saved as default.")
 
-def find_device_by_name(device_name):
-    """Find audio device by name using PyAudio"""
+def find_device_by_name(device_name, cached_index=None, host_api=None):
+    """Find audio device by name using PyAudio, trying the cached index before a full scan"""
     try:
         p = pyaudio.PyAudio()
-        for i in range(p.get_device_count()):
-            device_info = p.get_device_info_by_index(i)
-            if device_info['name'] == device_name and device_info['maxInputChannels'] > 0:
-                device_info['index'] = i  # Add index for PyAudio
-                p.terminate()
-                return device_info
-        p.terminate()
+        try:
+            if cached_index is not None and 0 <= cached_index < p.get_device_count():
+                device_info = p.get_device_info_by_index(cached_index)
+                if (device_info['name'] == device_name
+                        and device_info['maxInputChannels'] > 0
+                        and (host_api is None or device_info.get('hostApi') == host_api)):
+                    device_info['index'] = cached_index
+                    return device_info
+            for i in range(p.get_device_count()):
+                device_info = p.get_device_info_by_index(i)
+                if device_info['name'] == device_name and device_info['maxInputChannels'] > 0:
+                    device_info['index'] = i  # Add index for PyAudio
+                    return device_info
+        finally:
+            p.terminate()
     except Exception as e:
         print(f"Error finding device: {e}")
     return None
 
+def find_saved_device(device_config):
+    """Resolve a config from load_device_config() to a PyAudio device dict, or None"""
+    if not device_config.get("name"):
+        return None
+    return find_device_by_name(
+        device_config["name"],
+        device_config.get("index"),
+        device_config.get("host_api"),
+    )
+
+def faster_whisper_model_name(model_name):
+    """Map a Hugging Face Whisper id (openai/whisper-small) to a faster-whisper size name (small)"""
+    prefix = "openai/whisper-"
+    if model_name.startswith(prefix):
+        return model_name[len(prefix):]
+    return model_name
+
+def detect_torch_device():
+    """Pick the torch device for the models: (0, fp16) on CUDA, ("mps", fp16) on Apple GPUs, else (-1, None)"""
+    mps_backend = getattr(torch.backends, "mps", None)
+    if torch.cuda.is_available():
+        return 0, torch.float16
+    if mps_backend is not None and mps_backend.is_available():
+        return "mps", torch.float16
+    return -1, None
+
+def load_translator(torch_device, torch_dtype):
+    """Load the Helsinki-NLP translation pipeline (INT8 on CPU) and warm it with a dummy sentence"""
+    translator_kwargs = {
+        "model": "Helsinki-NLP/opus-mt-ar-en",
+        "device": torch_device,
+    }
+    if torch_dtype is not None:
+        translator_kwargs["torch_dtype"] = torch_dtype
+    try:
+        translator = pipeline("translation", **translator_kwargs)
+    except TypeError:
+        translator_kwargs.pop("torch_dtype", None)
+        translator = pipeline("translation", **translator_kwargs)
+    if torch_device == -1 and os.environ.get("TRANSLATION_INT8", "1").strip() != "0":
+        # CPU only: dynamic INT8 quantization of the Linear layers (set TRANSLATION_INT8=0 to disable)
+        try:
+            translator.model = torch.quantization.quantize_dynamic(
+                translator.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        except Exception as e:
+            print(f"⚠️ INT8 quantization unavailable, using fp32 translator: {e}")
+    # The first call builds tokenizer state and kernels; pay for it here rather than on the first utterance
+    with torch.inference_mode():
+        translator("مرحبا", max_length=32)
+    return translator
+
+def load_faster_whisper(whisper_model, torch_device):
+    """Load faster-whisper (int8 on CPU, int8_float16 on CUDA)"""
+    asr_device = "cuda" if torch_device == 0 else "cpu"
+    return WhisperModel(
+        faster_whisper_model_name(whisper_model),
+        device=asr_device,
+        compute_type="int8_float16" if asr_device == "cuda" else "int8",
+        cpu_threads=ASR_THREADS,
+    )
+
+_preload_future = None
+
+def preload_models():
+    """Start loading the translator (and faster-whisper) in the background while the user picks a device"""
+    global _preload_future
+    if _preload_future is not None:
+        return
+    _preload_future = Future()
+
+    def do_preload():
+        try:
+            if os.environ.get("OFFLINE_ONLY", "0").strip() == "1":
+                os.environ.setdefault("HF_HUB_OFFLINE", "1")
+                os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+            torch_device, torch_dtype = detect_torch_device()
+            models = {"translator": load_translator(torch_device, torch_dtype)}
+            if WhisperModel is not None and os.environ.get("ASR_BACKEND", "whisper").strip().lower() == "whisper":
+                whisper_model = os.environ.get("WHISPER_MODEL", "openai/whisper-small").strip()
+                models["asr"] = load_faster_whisper(whisper_model, torch_device)
+            _preload_future.set_result(models)
+        except Exception as e:
+            _preload_future.set_exception(e)
+
+    threading.Thread(target=do_preload, daemon=True).start()
+
+def take_preloaded_models():
+    """Wait for the models started by preload_models; returns {} if nothing was preloaded or loading failed"""
+    if _preload_future is None:
+        return {}
+    try:
+        return _preload_future.result()
+    except Exception as e:
+        print(f"⚠️ Background model loading failed, loading now: {e}")
+        return {}
+
+def _energy_vad(x, threshold, min_crossings):
+    """Single pass over the chunk: mean energy and zero-crossing count"""
+    energy = 0.0
+    crossings = 0
+    prev = 0.0
+    for i in range(x.size):
+        v = x[i]
+        energy += v * v
+        if v * prev < 0:
+            crossings += 1
+        prev = v
+    if x.size == 0:
+        return False
+    return (energy / x.size) > threshold and crossings > min_crossings
+
+if njit is not None:
+    chunk_has_speech = njit(cache=True, fastmath=True)(_energy_vad)
+else:
+    def chunk_has_speech(x, threshold, min_crossings):
+        """NumPy fallback for the energy/zero-crossing gate when numba is unavailable"""
+        if x.size == 0:
+            return False
+        energy = float(np.dot(x, x)) / x.size
+        crossings = int(np.count_nonzero(x[1:] * x[:-1] < 0))
+        return energy > threshold and crossings > min_crossings
+
+def _f32_to_i16(x, out):
+    """Scale, clip and store float32 samples as int16 in one pass"""
+    for i in range(x.shape[0]):
+        v = x[i] * 32767.0
+        if v > 32767.0:
+            v = 32767.0
+        elif v < -32768.0:
+            v = -32768.0
+        out[i] = np.int16(v)
+
+f32_to_i16 = njit(cache=True, fastmath=True)(_f32_to_i16) if njit is not None else None
+
 class ArabicAudioTranscriber:
     def __init__(self, selected_device=None):
         """Initialize the transcriber with audio capture and translation models"""
@@ -69,42 +312,60 @@ class ArabicAudioTranscriber:
         # Store selected device
         self.selected_device = selected_device
         
-        # Initialize transcript storage
-        self.transcripts = []
+        # Transcript file, opened on the first entry and appended to as entries arrive
         self.session_start_time = datetime.now()
+        self.transcript_count = 0
+        self._transcript_file = None
+        self._transcript_path = None
+        self._transcript_closed = False
         
         # Register cleanup function to save transcripts on exit
         atexit.register(self.save_transcript)
         
-        # Keyboard shortcut flag
+        # Keyboard shortcut flag; the main thread sleeps on the event until a session should end
         self.device_change_requested = False
+        self._stop_evt = threading.Event()
+        self._wake_pipe = None
 
-        self.asr_backend = os.environ.get("ASR_BACKEND", "google").strip().lower()
+        self.asr_backend = os.environ.get("ASR_BACKEND", "whisper").strip().lower()
         self.asr_fallback = os.environ.get("ASR_FALLBACK", "whisper").strip().lower()
         if self.asr_fallback in ("", "none", "null", "0"):
             self.asr_fallback = None
         self.offline_only = os.environ.get("OFFLINE_ONLY", "0").strip() == "1"
+        if self.asr_backend in GOOGLE_ASR_BACKENDS and sr is None:
+            raise RuntimeError(f"ASR_BACKEND={self.asr_backend} needs SpeechRecognition: pip install SpeechRecognition")
 
-        self.torch_device = 0 if torch.cuda.is_available() else -1
-        self.torch_dtype = torch.float16 if self.torch_device == 0 else None
+        self.torch_device, self.torch_dtype = detect_torch_device()
         if self.torch_device == 0:
             print("✅ GPU detected (CUDA). Using GPU acceleration.")
+        elif self.torch_device == "mps":
+            print("✅ Apple GPU detected (MPS). Using GPU acceleration for translation.")
         else:
             print("⚠️ CUDA not available. Using CPU.")
+
+        # Models loaded by preload_models() while the user was choosing a device
+        preloaded = take_preloaded_models()
         
         # PyAudio setup
         self.pyaudio_instance = pyaudio.PyAudio()
         self.stream = None
         
-        # Initialize speech recognizer (Google web API)
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
+        # Initialize speech recognizer (Google web API; optional when using Whisper)
+        self.recognizer = None
+        if sr is not None:
+            self.recognizer = sr.Recognizer()
+            self.recognizer.energy_threshold = 300
+            self.recognizer.dynamic_energy_threshold = True
         self.speech_api_timeout_s = 12
         socket.setdefaulttimeout(self.speech_api_timeout_s)
 
-        # Initialize offline ASR (Whisper via transformers)
+        self._http_loop = None
+        self._http_session = None
+        self.google_speech_key = os.environ.get("GOOGLE_SPEECH_KEY", "").strip()
+
+        # Initialize offline ASR (faster-whisper if installed, else Whisper via transformers)
         self.asr = None
+        self.asr_engine = None
         needs_whisper = self.asr_backend == "whisper" or self.asr_fallback == "whisper"
         if needs_whisper:
             whisper_model = os.environ.get("WHISPER_MODEL", "openai/whisper-small").strip()
@@ -113,22 +374,14 @@ class ArabicAudioTranscriber:
                 os.environ.setdefault("HF_HUB_OFFLINE", "1")
                 os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
             try:
-                asr_kwargs = {
-                    "model": whisper_model,
-                    "device": self.torch_device,
-                }
-                if self.torch_dtype is not None:
-                    asr_kwargs["torch_dtype"] = self.torch_dtype
-                try:
-                    self.asr = pipeline("automatic-speech-recognition", **asr_kwargs)
-                except TypeError:
-                    asr_kwargs.pop("torch_dtype", None)
-                    self.asr = pipeline("automatic-speech-recognition", **asr_kwargs)
-                try:
-                    self.asr.feature_extractor.return_attention_mask = True
-                except Exception:
-                    pass
-                print("✅ Offline ASR ready.")
+                if WhisperModel is not None:
+                    self.asr = preloaded.get("asr") or load_faster_whisper(whisper_model, self.torch_device)
+                    self.asr_engine = "faster_whisper"
+                    print("✅ Offline ASR ready (faster-whisper).")
+                else:
+                    self.asr = self.load_transformers_asr(whisper_model)
+                    self.asr_engine = "transformers"
+                    print("✅ Offline ASR ready.")
             except Exception as e:
                 print(f"❌ Failed to initialize offline ASR: {e}")
                 if self.offline_only:
@@ -136,37 +389,303 @@ class ArabicAudioTranscriber:
                 else:
                     print("💡 Offline ASR unavailable. Set ASR_FALLBACK=none to silence fallback attempts.")
                 self.asr = None
+                if self.asr_backend == "whisper" and sr is None:
+                    print("💡 Install SpeechRecognition to fall back to Google speech recognition.")
+                    raise
                 if self.asr_backend == "whisper":
                     print("💡 Falling back to Google speech recognition for now (set ASR_BACKEND=google to force).")
                     self.asr_backend = "google"
                 if self.asr_fallback == "whisper":
                     self.asr_fallback = None
         
+        # Google web API over one kept-alive aiohttp session on a background event loop, so chunks
+        # reuse the TCP connection instead of paying DNS + connect per request. Decided after the
+        # Whisper load, which may have fallen back to Google. Needs GOOGLE_SPEECH_KEY; without it
+        # SpeechRecognition's recognize_google (and its built-in key) is used per request.
+        if self.asr_backend in ("google", "google_web"):
+            if aiohttp is None:
+                print("⚠️ aiohttp is not installed. Google requests will open a new connection per chunk.")
+            elif not self.google_speech_key:
+                print("ℹ️ GOOGLE_SPEECH_KEY is not set. Google requests will open a new connection per chunk.")
+            else:
+                self.start_http_loop()
+
         # Initialize translation pipeline (Helsinki-NLP)
-        print("Loading translation model (this may take a moment on first run)...")
-        self.translator = pipeline(
-            "translation", 
-            model="Helsinki-NLP/opus-mt-ar-en",
-            device=self.torch_device
-        )
+        self.translator = preloaded.get("translator")
+        if self.translator is None:
+            print("Loading translation model (this may take a moment on first run)...")
+            self.translator = load_translator(self.torch_device, self.torch_dtype)
         
         # Audio settings
         self.sample_rate = 16000  # 16kHz for speech recognition
         self.chunk_duration = 3  # Process audio in 3-second chunks
+        # Max ready windows read as one span and merged into one ASR call (1 disables merging)
+        try:
+            self.asr_batch_chunks = max(1, int(os.environ.get("ASR_BATCH_CHUNKS", "4").strip()))
+        except ValueError:
+            self.asr_batch_chunks = 4
+
+        # Energy gate: chunks below this mean energy are dropped before ASR (0 disables)
+        try:
+            self.vad_threshold = float(os.environ.get("VAD_THRESHOLD", "1e-4").strip())
+        except ValueError:
+            self.vad_threshold = 1e-4
+        self.vad_min_crossings = 20
+        # Compile the gate now so the first real chunk doesn't pay the JIT cost
+        chunk_has_speech(np.zeros(16, dtype=np.float32), self.vad_threshold, self.vad_min_crossings)
+        if f32_to_i16 is not None:
+            f32_to_i16(np.zeros(16, dtype=np.float32), np.empty(16, dtype=np.int16))
+
+        # Second tier: WebRTC VAD crops each chunk to its voiced span before ASR (-1 disables)
+        try:
+            self.webrtc_vad_mode = int(os.environ.get("WEBRTC_VAD_MODE", "2").strip())
+        except ValueError:
+            self.webrtc_vad_mode = 2
+        if webrtcvad is None or not 0 <= self.webrtc_vad_mode <= 3:
+            self.webrtc_vad_mode = None
+        self.vad_frame_ms = 30
+        self.vad_hangover_ms = 200
+        self.vad_min_voiced_ms = 300
+
+        # Sliding window: 3 s windows emitted every 2.5 s so words on a boundary land in both
+        self.window_overlap = 0.5  # seconds shared by consecutive windows
+        # Capture backend: sounddevice hands the callback a raw buffer, PyAudio allocates bytes per block
+        self.capture_backend = os.environ.get("CAPTURE_BACKEND", "sounddevice" if sd else "pyaudio").strip().lower()
+        if self.capture_backend == "sounddevice" and sd is None:
+            print("⚠️ sounddevice is not installed. Falling back to PyAudio capture.")
+            self.capture_backend = "pyaudio"
+
+        # PortAudio buffer size, independent of the ASR window (2048 frames = 128 ms)
+        try:
+            self.frames_per_buffer = max(256, int(os.environ.get("FRAMES_PER_BUFFER", "2048").strip()))
+        except ValueError:
+            self.frames_per_buffer = 2048
+        self._input_overflows = 0
+        self._input_underflows = 0
+        # Single-producer/single-consumer ring: the stream callback only writes and advances
+        # _ring_written, the capture thread only reads, so neither side needs a lock.
+        # It holds a full merged span (asr_batch_chunks windows) plus one hop of slack.
+        chunk_s = self.chunk_duration
+        hop_s = chunk_s - self.window_overlap
+        ring_s = max(10, chunk_s + self.asr_batch_chunks * hop_s)
+        self._ring = np.zeros(int(self.sample_rate * ring_s), dtype=np.float32)
+        self._ring_written = 0  # total frames written by the callback
+        self._last_words = []
+
+        # Per-thread scratch buffers for the float32 -> int16 conversion (grown on demand)
+        self._scratch = threading.local()
         
         # Threading components
-        self.audio_queue = queue.Queue()
+        self.translate_queue = queue.Queue()  # Transcription futures, in submission order
+        self.translate_batch_size = 8
+        self.translate_batch_wait = 0.2  # seconds to wait for more text before translating
+
+        # LRU cache of translations for recurring phrases (TRANSLATION_CACHE_SIZE=0 disables)
+        try:
+            self.translation_cache_size = max(0, int(os.environ.get("TRANSLATION_CACHE_SIZE", "2048").strip()))
+        except ValueError:
+            self.translation_cache_size = 2048
+        self._translation_cache = OrderedDict()
+        self._cache_lookups = 0
+        self._cache_hits = 0
+
+        # Transcription workers: network-bound Google calls overlap; local Whisper runs one at a time
+        default_workers = "1" if self.asr_backend == "whisper" else "4"
+        try:
+            stt_workers = max(1, int(os.environ.get("STT_WORKERS", default_workers).strip()))
+        except ValueError:
+            stt_workers = int(default_workers)
+        self._stt_pool = ThreadPoolExecutor(max_workers=stt_workers, initializer=self.release_capture_core)
+        self.stt_workers = stt_workers
+        self.stt_max_backlog = 10  # pending transcriptions before the oldest is dropped
+        self._dropped_chunks = 0
         self.running = False
         
         print("Initialization complete!\n")
 
+    def load_transformers_asr(self, whisper_model):
+        """Load Whisper through the transformers pipeline (used when faster-whisper is not installed)"""
+        asr_kwargs = {
+            "model": whisper_model,
+            "device": self.torch_device,
+        }
+        if self.torch_dtype is not None:
+            asr_kwargs["torch_dtype"] = self.torch_dtype
+        try:
+            asr = pipeline("automatic-speech-recognition", **asr_kwargs)
+        except TypeError:
+            asr_kwargs.pop("torch_dtype", None)
+            asr = pipeline("automatic-speech-recognition", **asr_kwargs)
+        try:
+            asr.feature_extractor.return_attention_mask = True
+        except Exception:
+            pass
+        return asr
+
+    def to_audio_data(self, audio_data):
+        """Wrap a float32 chunk as 16-bit PCM for the Google speech backends
+
+        The returned AudioData views this thread's scratch buffer without copying, so it is
+        only valid until the next conversion on the same thread; copy it before handing it
+        to another thread.
+        """
+        return sr.AudioData(
+            memoryview(self.to_pcm16(audio_data)).cast("B"),
+            self.sample_rate,
+            2,
+        )
+
+    def to_pcm16(self, audio_data):
+        """Convert a float32 chunk to int16 in this thread's scratch buffer (valid until the next call)"""
+        n = audio_data.shape[0]
+        scratch = self._scratch
+        if getattr(scratch, "i16", None) is None or scratch.i16.shape[0] < n:
+            size = max(n, int(self.sample_rate * self.chunk_duration))
+            scratch.i16 = np.empty(size, dtype=np.int16)
+            scratch.f32 = np.empty(size, dtype=np.float32) if f32_to_i16 is None else None
+        audio_data_int16 = scratch.i16[:n]
+        if f32_to_i16 is not None:
+            f32_to_i16(audio_data, audio_data_int16)
+            return audio_data_int16
+        scaled = scratch.f32[:n]
+        np.multiply(audio_data, 32767.0, out=scaled)
+        np.clip(scaled, -32768, 32767, out=scaled)
+        audio_data_int16[:] = scaled
+        return audio_data_int16
+
+    def crop_to_voiced(self, audio_data):
+        """Trim a chunk to its voiced span using WebRTC VAD; None if it holds too little speech"""
+        scratch = self._scratch
+        vad = getattr(scratch, "vad", None)
+        if vad is None:
+            # Vad instances keep internal state, so each worker thread gets its own
+            vad = scratch.vad = webrtcvad.Vad(self.webrtc_vad_mode)
+
+        frame = self.sample_rate * self.vad_frame_ms // 1000
+        pcm = self.to_pcm16(audio_data).tobytes()
+        frame_bytes = frame * 2
+        n_frames = len(pcm) // frame_bytes
+        first = last = -1
+        voiced = 0
+        for i in range(n_frames):
+            if vad.is_speech(pcm[i * frame_bytes:(i + 1) * frame_bytes], self.sample_rate):
+                if first < 0:
+                    first = i
+                last = i
+                voiced += 1
+
+        if voiced * self.vad_frame_ms < self.vad_min_voiced_ms:
+            return None
+        # Keep a hangover on both sides so word onsets and tails are not clipped
+        pad = self.sample_rate * self.vad_hangover_ms // 1000
+        start = max(0, first * frame - pad)
+        end = min(audio_data.shape[0], (last + 1) * frame + pad)
+        return audio_data[start:end]
+
+    def translate_batch(self, arabic_texts):
+        """Translate a list of Arabic strings to English, running the model only for cache misses"""
+        cache = self._translation_cache
+        keys = [" ".join(text.split()) for text in arabic_texts]
+        results = [None] * len(keys)
+        misses = []
+        for i, key in enumerate(keys):
+            if self.translation_cache_size and key in cache:
+                cache.move_to_end(key)
+                results[i] = cache[key]
+                self._cache_hits += 1
+            else:
+                misses.append(i)
+        self._cache_lookups += len(keys)
+
+        if misses:
+            with torch.inference_mode():
+                translations = self.translator(
+                    [arabic_texts[i] for i in misses],
+                    batch_size=len(misses),
+                    max_length=512,
+                    truncation=True
+                )
+            for i, t in zip(misses, translations):
+                results[i] = t['translation_text']
+                if self.translation_cache_size:
+                    cache[keys[i]] = results[i]
+                    if len(cache) > self.translation_cache_size:
+                        cache.popitem(last=False)
+
+        # Not worth the memory if the stream rarely repeats itself
+        if self.translation_cache_size and self._cache_lookups >= 200 and self._cache_hits < 0.05 * self._cache_lookups:
+            self.translation_cache_size = 0
+            cache.clear()
+        return results
+
+    def start_http_loop(self):
+        """Run an asyncio loop in a daemon thread to own the shared aiohttp session"""
+        self._http_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._http_loop.run_forever, daemon=True).start()
+
+    def stop_http_loop(self):
+        """Close the aiohttp session and stop its event loop"""
+        loop = self._http_loop
+        if loop is None:
+            return
+        self._http_loop = None
+        if self._http_session is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._http_session.close(), loop).result(timeout=2)
+            except Exception:
+                pass
+            self._http_session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _recognize_async(self, flac_data, sample_rate):
+        """POST one FLAC chunk to the Google web speech API on the persistent session"""
+        if self._http_session is None:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.speech_api_timeout_s),
+            )
+        params = {"client": "chromium", "lang": "ar-AR", "key": self.google_speech_key}
+        headers = {"Content-Type": f"audio/x-flac; rate={sample_rate}"}
+        try:
+            async with self._http_session.post(GOOGLE_SPEECH_URL, params=params, data=flac_data, headers=headers) as resp:
+                if resp.status != 200:
+                    raise RequestError(f"recognition request failed: HTTP {resp.status}")
+                body = await resp.text()
+        except aiohttp.ClientError as e:
+            raise RequestError(f"recognition connection failed: {e}")
+
+        # The API returns one JSON object per line; the first is usually an empty result
+        for line in body.split("\n"):
+            if not line:
+                continue
+            results = json.loads(line).get("result", [])
+            if results:
+                alternatives = results[0].get("alternative", [])
+                if alternatives and alternatives[0].get("transcript"):
+                    return alternatives[0]["transcript"]
+        raise UnknownValueError()
+
     def recognize_arabic(self, audio):
+        if self._http_loop is not None:
+            flac_data = audio.get_flac_data(convert_width=2)
+            future = asyncio.run_coroutine_threadsafe(
+                self._recognize_async(flac_data, audio.sample_rate), self._http_loop
+            )
+            try:
+                return future.result(timeout=self.speech_api_timeout_s + 1)
+            except FutureTimeoutError:
+                future.cancel()
+                raise TimeoutError(f"Speech recognition timed out after ~{self.speech_api_timeout_s}s")
+
+        # do_recognize may outlive a timeout, so give it its own copy of the scratch-backed PCM
+        audio = sr.AudioData(bytes(audio.frame_data), audio.sample_rate, audio.sample_width)
         result_queue = queue.Queue(maxsize=1)
 
         def do_recognize():
             try:
                 text = self.recognizer.recognize_google(
                     audio,
+                    key=self.google_speech_key or None,
                     language="ar-AR",
                     show_all=False,
                 )
@@ -198,6 +717,8 @@ class ArabicAudioTranscriber:
                 "or set GOOGLE_CLOUD_CREDENTIALS_JSON to the JSON contents."
             )
 
+        # do_recognize may outlive a timeout, so give it its own copy of the scratch-backed PCM
+        audio = sr.AudioData(bytes(audio.frame_data), audio.sample_rate, audio.sample_width)
         result_queue = queue.Queue(maxsize=1)
 
         def do_recognize():
@@ -226,6 +747,15 @@ class ArabicAudioTranscriber:
     def recognize_arabic_offline(self, audio_array):
         if not self.asr:
             raise RuntimeError("Offline ASR is not initialized")
+        if self.asr_engine == "faster_whisper":
+            # faster-whisper consumes 16 kHz float32 directly; beam_size=1 keeps decoding greedy
+            segments, _ = self.asr.transcribe(
+                audio_array.astype(np.float32, copy=False),
+                language="ar",
+                beam_size=1,
+                vad_filter=True,
+            )
+            return " ".join(seg.text.strip() for seg in segments).strip()
         result = self.asr(
             {"array": audio_array.astype(np.float32), "sampling_rate": self.sample_rate},
             generate_kwargs={"task": "transcribe", "language": "ar"},
@@ -234,44 +764,195 @@ class ArabicAudioTranscriber:
         text = (result or {}).get("text", "")
         return text.strip()
     
+    def _write_ring(self, samples):
+        """Copy one block of samples into the preallocated ring buffer (producer side)"""
+        n = samples.shape[0]
+        ring = self._ring
+        written = self._ring_written
+        start = written % ring.shape[0]
+        split = min(n, ring.shape[0] - start)
+        np.copyto(ring[start:start + split], samples[:split])
+        if split < n:
+            np.copyto(ring[:n - split], samples[split:])
+        # Publish only after the copy so the reader never sees frames that are not there yet
+        self._ring_written = written + n
+
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio callback: append the incoming block to the ring buffer"""
+        if status & pyaudio.paInputOverflow:
+            self._input_overflows += 1
+        if status & pyaudio.paInputUnderflow:
+            self._input_underflows += 1
+        self._write_ring(np.frombuffer(in_data, dtype=np.float32))
+        return (None, pyaudio.paContinue if self.running else pyaudio.paComplete)
+
+    def _sd_callback(self, indata, frames, time_info, status):
+        """sounddevice callback: view PortAudio's buffer without copying and append it to the ring"""
+        if status.input_overflow:
+            self._input_overflows += 1
+        if status.input_underflow:
+            self._input_underflows += 1
+        self._write_ring(np.frombuffer(indata, dtype=np.float32, count=frames))
+
+    def open_input_stream(self):
+        """Open and start a callback-mode input stream on the selected device"""
+        if self.capture_backend == "sounddevice":
+            # sounddevice ships its own PortAudio, so match the device by name rather than index
+            device_index = self.selected_device['index']
+            for i, info in enumerate(sd.query_devices()):
+                if info['name'] == self.selected_device['name'] and info['max_input_channels'] > 0:
+                    device_index = i
+                    break
+            stream = sd.RawInputStream(
+                samplerate=self.sample_rate,
+                blocksize=self.frames_per_buffer,
+                dtype="float32",
+                channels=1,
+                device=device_index,
+                callback=self._sd_callback
+            )
+            stream.start()
+            return stream
+        stream = self.pyaudio_instance.open(
+            format=pyaudio.paFloat32,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.selected_device['index'],
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._pa_callback
+        )
+        stream.start_stream()
+        return stream
+
+    def close_input_stream(self):
+        """Stop and close the input stream opened by open_input_stream"""
+        stream = self.stream
+        self.stream = None
+        if not stream:
+            return
+        if hasattr(stream, "stop_stream"):
+            stream.stop_stream()
+        else:
+            stream.stop()
+        stream.close()
+
+    def _read_window(self, end, length):
+        """Copy the `length` frames ending at absolute frame `end` out of the ring (consumer side)
+
+        Returns None if the callback lapped the ring and overwrote part of the window mid-copy.
+        """
+        ring = self._ring
+        size = ring.shape[0]
+        window = np.empty(length, dtype=np.float32)
+        start = (end - length) % size
+        split = min(length, size - start)
+        window[:split] = ring[start:start + split]
+        if split < length:
+            window[split:] = ring[:length - split]
+        if self._ring_written - (end - length) > size:
+            return None
+        return window
+
+    def dedupe_overlap(self, text):
+        """Drop leading words that repeat the tail of the previous window's transcript"""
+        words = text.split()
+        prev = self._last_words
+        overlap = 0
+        for k in range(min(len(prev), len(words)), 0, -1):
+            if prev[-k:] == words[:k]:
+                overlap = k
+                break
+        self._last_words = words
+        return " ".join(words[overlap:])
+
+    def pin_capture_thread(self):
+        """Pin the calling thread to the reserved capture core (Linux only)"""
+        if CAPTURE_CORE is None:
+            return
+        try:
+            # pid 0 is the calling thread on Linux
+            os.sched_setaffinity(0, {CAPTURE_CORE})
+        except OSError as e:
+            print(f"⚠️ Could not pin capture thread: {e}")
+
+    @staticmethod
+    def release_capture_core():
+        """Pool initializer: the capture thread starts the STT workers, so undo the pin they inherit"""
+        if MODEL_CORES is None:
+            return
+        try:
+            os.sched_setaffinity(0, MODEL_CORES)
+        except OSError:
+            pass
+
     def capture_audio(self):
-        """Capture audio from the selected device using PyAudio"""
+        """Cut windows straight out of the ring buffer and submit them for transcription"""
         try:
             if not self.selected_device:
                 print("❌ No audio device selected")
                 return
                 
             print(f"🎤 Starting audio capture from: {self.selected_device['name']}")
+            self.pin_capture_thread()
             
-            # Calculate chunk size
+            # Window and hop sizes
             chunk_size = int(self.sample_rate * self.chunk_duration)
+            hop_size = chunk_size - int(self.sample_rate * self.window_overlap)
+            ring_size = self._ring.shape[0]
+            batch_chunks = self.asr_batch_chunks
+            pending = deque()
+            next_window_end = self._ring_written + chunk_size
+            poll_s = self.frames_per_buffer / self.sample_rate
             
-            # Open PyAudio stream
-            self.stream = self.pyaudio_instance.open(
-                format=pyaudio.paFloat32,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=self.selected_device['index'],
-                frames_per_buffer=chunk_size
-            )
+            # Open the stream in callback mode; PortAudio fills the ring buffer
+            self.stream = self.open_input_stream()
+            reported_xruns = (self._input_overflows, self._input_underflows)
             
             while self.running:
                 try:
-                    # Read audio data
-                    audio_data = self.stream.read(chunk_size, exception_on_overflow=False)
-                    
-                    # Convert to numpy array
-                    audio_array = np.frombuffer(audio_data, dtype=np.float32)
-                    
-                    if len(audio_array) > 0:
-                        # Add to queue for processing
-                        self.audio_queue.put(audio_array)
-                    
                     # Check if device change was requested
                     if self.device_change_requested:
                         print("🔄 Device change requested, stopping current capture...")
                         break
+
+                    # Wait until a full window is available
+                    written = self._ring_written
+                    if written < next_window_end:
+                        time.sleep(poll_s)
+                        continue
+                    if written - next_window_end > ring_size - chunk_size:
+                        # Fell behind by more than the ring holds; resume from the newest audio
+                        next_window_end = written
+                        self.report_dropped_chunk("Audio ring overrun")
+
+                    # While every worker is busy, hold complete windows in the ring instead of
+                    # queueing one future each; once a worker frees up (or batch_chunks windows
+                    # are waiting) they are read as one contiguous span (their shared overlap
+                    # appears once) and transcribed in a single ASR call
+                    ready = 1 + (written - next_window_end) // hop_size
+                    if ready < batch_chunks and sum(not f.done() for f in pending) >= self.stt_workers:
+                        time.sleep(poll_s)
+                        continue
+                    span_end = next_window_end + (min(ready, batch_chunks) - 1) * hop_size
+                    audio_array = self._read_window(span_end, chunk_size + span_end - next_window_end)
+                    next_window_end = span_end + hop_size
+                    if audio_array is None:
+                        self.report_dropped_chunk("Audio ring overrun")
+                        continue
+
+                    # Report driver overflows/underflows seen by the callback since the last window
+                    xruns = (self._input_overflows, self._input_underflows)
+                    if xruns != reported_xruns:
+                        print(f"\n⚠️ Audio input overflows: {xruns[0]}, underflows: {xruns[1]}")
+                        reported_xruns = xruns
+                    
+                    if len(audio_array) > 0 and (
+                        self.vad_threshold <= 0
+                        or chunk_has_speech(audio_array, self.vad_threshold, self.vad_min_crossings)
+                    ):
+                        # Submit for transcription (silent chunks are skipped)
+                        self.submit_chunk(audio_array, pending)
                         
                 except Exception as e:
                     print(f"⚠️ Audio capture error: {e}")
@@ -287,108 +968,143 @@ class ArabicAudioTranscriber:
             print("   3. Check if the selected device is available")
             
         finally:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
+            self.close_input_stream()
+            # Tell the translator thread no more text is coming
+            self.translate_queue.put(None)
             print("🛑 Audio capture stopped")
     
-    def process_audio(self):
-        """Process audio chunks from queue: transcribe and translate"""
-        while self.running or not self.audio_queue.empty():
-            try:
-                # Get audio chunk from queue (timeout prevents hanging)
-                audio_data = self.audio_queue.get(timeout=1)
-                
+    def transcribe_chunk(self, audio_data):
+        """Transcribe one audio chunk, returning "" when there is no speech or recognition fails"""
+        try:
+            if self.webrtc_vad_mode is not None:
+                audio_data = self.crop_to_voiced(audio_data)
+                if audio_data is None:
+                    return ""
+
+            primary_backend = self.asr_backend
+            if primary_backend == "google_web":
+                primary_backend = "google"
+
+            if primary_backend == "whisper":
+                arabic_text = self.recognize_arabic_offline(audio_data)
+            elif primary_backend == "google":
+                arabic_text = self.recognize_arabic(self.to_audio_data(audio_data))
+            elif primary_backend == "google_cloud":
+                arabic_text = self.recognize_arabic_google_cloud(self.to_audio_data(audio_data))
+            else:
+                raise RuntimeError(f"Unknown ASR_BACKEND: {self.asr_backend}")
+            
+        except UnknownValueError:
+            # No speech detected in this chunk
+            arabic_text = ""
+        except RequestError as e:
+            print(f"\nError with speech recognition service: {e}")
+            arabic_text = ""
+        except TimeoutError as e:
+            print(f"\nError with speech recognition service: {e}")
+            arabic_text = ""
+        except Exception as e:
+            if self.asr_backend == "whisper":
+                hint = ""
+                if self.offline_only:
+                    hint = " (set OFFLINE_ONLY=0 to allow first-time model download)"
+                print(f"\nOffline ASR error: {e}{hint}")
+                arabic_text = ""
+            elif self.asr_fallback == "whisper" and self.asr:
                 try:
-                    # Transcribe Arabic audio
-                    print("Listening...", end="\r")
-                    audio_data_int16 = (audio_data * 32767).astype(np.int16)
-                    audio = sr.AudioData(
-                        audio_data_int16.tobytes(),
-                        self.sample_rate,
-                        2,
-                    )
-                    primary_backend = self.asr_backend
-                    if primary_backend == "google_web":
-                        primary_backend = "google"
-
-                    if primary_backend == "whisper":
-                        arabic_text = self.recognize_arabic_offline(audio_data)
-                    elif primary_backend == "google":
-                        arabic_text = self.recognize_arabic(audio)
-                    elif primary_backend == "google_cloud":
-                        arabic_text = self.recognize_arabic_google_cloud(audio)
-                    else:
-                        raise RuntimeError(f"Unknown ASR_BACKEND: {self.asr_backend}")
-                    
-                    if arabic_text:
-                        print(f"\n🎤 Arabic: {arabic_text}")
-                        
-                        # Translate to English
-                        translation = self.translator(
-                            arabic_text,
-                            max_length=512,
-                            truncation=True
-                        )
-                        english_text = translation[0]['translation_text']
-                        print(f"🔤 English: {english_text}")
-                        print("-" * 50)
-                        
-                        # Store transcript entry
-                        transcript_entry = {
-                            'timestamp': datetime.now().isoformat(),
-                            'arabic_text': arabic_text,
-                            'english_text': english_text
-                        }
-                        self.transcripts.append(transcript_entry)
-                    
-                except sr.UnknownValueError:
-                    # No speech detected in this chunk
-                    pass
-                except sr.RequestError as e:
-                    print(f"\nError with speech recognition service: {e}")
-                except TimeoutError as e:
+                    arabic_text = self.recognize_arabic_offline(audio_data)
+                except Exception as fallback_error:
                     print(f"\nError with speech recognition service: {e}")
-                except Exception as e:
-                    if self.asr_backend == "whisper":
-                        hint = ""
-                        if self.offline_only:
-                            hint = " (set OFFLINE_ONLY=0 to allow first-time model download)"
-                        print(f"\nOffline ASR error: {e}{hint}")
-                    else:
-                        if self.asr_fallback == "whisper" and self.asr:
-                            try:
-                                arabic_text = self.recognize_arabic_offline(audio_data)
-                            except Exception as fallback_error:
-                                print(f"\nError with speech recognition service: {e}")
-                                print(f"\nOffline ASR error: {fallback_error}")
-                                arabic_text = ""
-                        else:
-                            print(f"\nError with speech recognition service: {e}")
-                            arabic_text = ""
-                        if arabic_text:
-                            print(f"\n🎤 Arabic: {arabic_text}")
-                            translation = self.translator(
-                                arabic_text,
-                                max_length=512,
-                                truncation=True
-                            )
-                            english_text = translation[0]['translation_text']
-                            print(f"🔤 English: {english_text}")
-                            print("-" * 50)
-                            transcript_entry = {
-                                'timestamp': datetime.now().isoformat(),
-                                'arabic_text': arabic_text,
-                                'english_text': english_text
-                            }
-                            self.transcripts.append(transcript_entry)
-                        continue
-                
-            except queue.Empty:
+                    print(f"\nOffline ASR error: {fallback_error}")
+                    arabic_text = ""
+            else:
+                print(f"\nError with speech recognition service: {e}")
+                arabic_text = ""
+        return arabic_text or ""
+
+    def report_dropped_chunk(self, reason):
+        """Count a window lost to backpressure and report it without flooding the console"""
+        self._dropped_chunks += 1
+        if self._dropped_chunks == 1 or self._dropped_chunks % 10 == 0:
+            print(f"\n⚠️ {reason}, dropped chunk ({self._dropped_chunks} total)")
+
+    def submit_chunk(self, audio_data, pending):
+        """Hand a window to the transcription pool and queue its future for the translator thread"""
+        # Drop the oldest queued transcription when the workers fall too far behind
+        while pending and pending[0].done():
+            pending.popleft()
+        if len(pending) >= self.stt_max_backlog:
+            # Running futures can't be cancelled; drop the oldest one that hasn't started
+            for future in pending:
+                if future.cancel():
+                    pending.remove(future)
+                    self.report_dropped_chunk("Transcription backlog")
+                    break
+
+        # Transcribe Arabic audio
+        print("Listening...", end="\r")
+        future = self._stt_pool.submit(self.transcribe_chunk, audio_data)
+        pending.append(future)
+        self.translate_queue.put(future)
+
+    def translate_text(self):
+        """Translate transcriptions in micro-batches and record the results in submission order"""
+        # Bind per-batch lookups once; this loop runs for the whole session
+        q_get = self.translate_queue.get
+        clock = time.time
+        now = datetime.now
+        dedupe = self.dedupe_overlap
+        translate = self.translate_batch
+        append = self.write_transcript_entry
+        batch_size = self.translate_batch_size
+        batch_wait = self.translate_batch_wait
+        separator = "-" * 50
+        finished = False
+        while not finished:
+            future = q_get()
+            if future is None:
+                break
+
+            # Collect whatever else arrives within the batch window
+            futures = [future]
+            deadline = clock() + batch_wait
+            while len(futures) < batch_size:
+                remaining = deadline - clock()
+                if remaining <= 0:
+                    break
+                try:
+                    future = q_get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if future is None:
+                    finished = True
+                    break
+                futures.append(future)
+
+            # Resolve in submission order so overlap dedupe sees consecutive windows
+            batch = []
+            for future in futures:
+                try:
+                    arabic_text = future.result()
+                except CancelledError:
+                    continue
+                arabic_text = dedupe(arabic_text)
+                if arabic_text:
+                    batch.append(arabic_text)
+            if not batch:
                 continue
+
+            try:
+                english_texts = translate(batch)
             except Exception as e:
-                print(f"\nError processing audio: {e}")
+                print(f"\nTranslation error: {e}")
+                continue
+
+            for arabic_text, english_text in zip(batch, english_texts):
+                print("\n🎤 Arabic: " + arabic_text + "\n🔤 English: " + english_text + "\n" + separator)
+                
+                # Store transcript entry
+                append(TranscriptEntry(now().isoformat(), arabic_text, english_text))
     
     def run(self):
         """Main run loop with threading for simultaneous capture and processing"""
@@ -398,29 +1114,41 @@ class ArabicAudioTranscriber:
         self.setup_keyboard_shortcuts()
         
         while True:
-            # Start audio capture thread
+            self._stop_evt.clear()
+            
+            # Start audio capture thread (reads windows from the ring and submits them for transcription)
             capture_thread = threading.Thread(target=self.capture_audio)
             capture_thread.start()
             
-            # Start audio processing thread
-            process_thread = threading.Thread(target=self.process_audio)
-            process_thread.start()
+            # Start translation thread
+            translate_thread = threading.Thread(target=self.translate_text)
+            translate_thread.start()
+            
+            # Watch the terminal for the device-change key
+            self._wake_pipe = os.pipe()
+            key_thread = threading.Thread(target=self.watch_keys, daemon=True)
+            key_thread.start()
             
             try:
-                # Keep main thread alive and check for device change requests
-                while self.running:
-                    if self.device_change_requested:
-                        print("\n\nStopping current session for device change...")
-                        self.running = False
-                        break
-                    time.sleep(0.1)
+                # Sleep until a device change is requested (no polling)
+                self._stop_evt.wait()
+                if self.device_change_requested:
+                    print("\n\nStopping current session for device change...")
+                self.running = False
             except KeyboardInterrupt:
                 print("\n\nStopping transcription...")
                 self.running = False
             
+            # Release the key watcher so the terminal is restored before any input()
+            os.write(self._wake_pipe[1], b"x")
+            key_thread.join(timeout=1)
+            for fd in self._wake_pipe:
+                os.close(fd)
+            self._wake_pipe = None
+            
             # Wait for threads to finish
             capture_thread.join(timeout=2)
-            process_thread.join(timeout=5)
+            translate_thread.join(timeout=5)
             
             # Handle device change request
             if self.device_change_requested:
@@ -456,59 +1184,57 @@ class ArabicAudioTranscriber:
         self.running = False
         print("\n🧹 Cleaning up resources...")
         
-        # Stop and close PyAudio stream
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
+        # Stop and close the input stream
+        self.close_input_stream()
         
         # Terminate PyAudio instance
         if self.pyaudio_instance:
             self.pyaudio_instance.terminate()
             self.pyaudio_instance = None
         
-        # Clear the audio queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Stop transcription workers
+        self._stt_pool.shutdown(wait=False)
+        self.stop_http_loop()
         
         print("✅ Cleanup completed")
     
+    def request_device_change(self):
+        """Flag a device change and wake the main thread"""
+        self.device_change_requested = True
+        print("\n🔄 Device change requested. Stopping current session...")
+        self._stop_evt.set()
+
+    def watch_keys(self):
+        """Request a device change when 'd' is pressed in the terminal (runs on its own thread)"""
+        if termios is None or not sys.stdin.isatty():
+            return
+        fd = sys.stdin.fileno()
+        wake_fd = self._wake_pipe[0]
+        old_attrs = termios.tcgetattr(fd)
+        try:
+            # cbreak: single keystrokes without Enter; Ctrl+C still raises SIGINT
+            tty.setcbreak(fd)
+            while True:
+                ready, _, _ = select.select([fd, wake_fd], [], [])
+                if wake_fd in ready:
+                    break
+                key = os.read(fd, 1)
+                if key in (b"d", b"D"):
+                    self.request_device_change()
+                    break
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
     def setup_keyboard_shortcuts(self):
         """Setup keyboard shortcuts for device selection"""
-        def on_device_change():
-            self.device_change_requested = True
-            if platform.system() == "Darwin":  # macOS
-                print("\n🔄 Device change requested. Press Cmd+C to stop current session and change device.")
-            else:
-                print("\n🔄 Device change requested. Press Ctrl+C to stop current session and change device.")
+        print("\n⌨️  Keyboard shortcuts:")
+        print("   D: Change audio device")
+        print("   Ctrl+C: Stop transcription")
         
-        try:
-            # Register platform-specific hotkey for device change
-            if platform.system() == "Darwin":  # macOS
-                # Use 'command' instead of 'cmd' for macOS
-                keyboard.add_hotkey('command+d', on_device_change)
-                print("\n⌨️  Keyboard shortcuts:")
-                print("   Cmd+D: Change audio device")
-                print("   Cmd+C: Stop transcription")
-            else:
-                keyboard.add_hotkey('ctrl+d', on_device_change)
-                print("\n⌨️  Keyboard shortcuts:")
-                print("   Ctrl+D: Change audio device")
-                print("   Ctrl+C: Stop transcription")
-        except Exception as e:
-            if platform.system() == "Darwin":
-                print("\n⚠️  Keyboard shortcuts unavailable (permissions required)")
-                print("   To enable: System Preferences > Security & Privacy > Privacy > Accessibility")
-                print("   Enable access for Terminal (or your Python IDE)")
-                print("\n⌨️  Alternative controls:")
-                print("   Cmd+C: Stop transcription (then restart to change device)")
-            else:
-                print(f"\n⚠️  Keyboard shortcuts unavailable: {e}")
-                print("\n⌨️  Alternative controls:")
-                print("   Ctrl+C: Stop transcription (then restart to change device)")
+        # SIGUSR1 also requests a device change (e.g. kill -USR1 <pid> from another terminal)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.request_device_change())
+            print(f"   kill -USR1 {os.getpid()}: Change audio device")
     
     def change_device_interactive(self):
         """Interactive device change during runtime"""
@@ -519,53 +1245,71 @@ class ArabicAudioTranscriber:
         new_device = select_audio_device()
         if new_device:
             self.selected_device = new_device
-            save_device_config(new_device.name)
-            print(f"\n✅ Device changed to: {new_device.name}")
+            print(f"\n✅ Device changed to: {new_device['name']}")
             return True
         else:
             print("\n❌ Device change cancelled.")
             return False
     
+    def write_transcript_entry(self, entry):
+        """Append one entry to the session transcript file, creating it on first use"""
+        if self._transcript_closed:
+            return
+        try:
+            if self._transcript_file is None:
+                # Create transcripts directory if it doesn't exist
+                transcript_dir = "transcripts"
+                if not os.path.exists(transcript_dir):
+                    os.makedirs(transcript_dir)
+                
+                # Generate filename with timestamp
+                timestamp = self.session_start_time.strftime("%Y%m%d_%H%M%S")
+                self._transcript_path = os.path.join(transcript_dir, f"transcript_{timestamp}.txt")
+                
+                # Line-buffered so every entry reaches disk even if the process is killed
+                self._transcript_file = open(self._transcript_path, 'a', encoding='utf-8', buffering=1)
+                f = self._transcript_file
+                f.write("=" * 60 + "\n")
+                f.write("ARABIC AUDIO TRANSCRIPTION SESSION\n")
+                f.write("=" * 60 + "\n")
+                f.write(f"Session Start: {self.session_start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"Audio Device: {self.selected_device['name'] if self.selected_device else 'Unknown'}\n")
+                f.write("=" * 60 + "\n\n")
+            
+            self.transcript_count += 1
+            entry_time = datetime.fromisoformat(entry.timestamp).strftime('%H:%M:%S')
+            self._transcript_file.write(
+                f"[{self.transcript_count:03d}] {entry_time}\n"
+                + "-" * 40 + "\n"
+                + f"🎤 Arabic:  {entry.arabic_text}\n"
+                + f"🔤 English: {entry.english_text}\n\n"
+            )
+        except Exception as e:
+            print(f"\n❌ Error writing transcript: {e}")
+
     def save_transcript(self):
-        """Save all transcripts to a text file"""
-        if not self.transcripts:
+        """Close the transcript file and write the session summary to a .meta sidecar"""
+        if self._transcript_closed:
+            return
+        self._transcript_closed = True
+        if self._transcript_file is None:
             print("No transcripts to save.")
             return
         
         try:
-            # Create transcripts directory if it doesn't exist
-            transcript_dir = "transcripts"
-            if not os.path.exists(transcript_dir):
-                os.makedirs(transcript_dir)
-            
-            # Generate filename with timestamp
-            timestamp = self.session_start_time.strftime("%Y%m%d_%H%M%S")
-            filename = f"transcript_{timestamp}.txt"
-            filepath = os.path.join(transcript_dir, filename)
+            self._transcript_file.close()
+            self._transcript_file = None
             
-            # Save to text file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # Write session header
-                f.write("=" * 60 + "\n")
-                f.write("ARABIC AUDIO TRANSCRIPTION SESSION\n")
-                f.write("=" * 60 + "\n")
+            # Session summary lives next to the transcript so the header never needs rewriting
+            meta_path = os.path.splitext(self._transcript_path)[0] + ".meta"
+            with open(meta_path, 'w', encoding='utf-8') as f:
                 f.write(f"Session Start: {self.session_start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Session End: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Audio Device: {self.selected_device.name if self.selected_device else 'Unknown'}\n")
-                f.write(f"Total Entries: {len(self.transcripts)}\n")
-                f.write("=" * 60 + "\n\n")
-                
-                # Write each transcript entry
-                for i, entry in enumerate(self.transcripts, 1):
-                    entry_time = datetime.fromisoformat(entry['timestamp']).strftime('%H:%M:%S')
-                    f.write(f"[{i:03d}] {entry_time}\n")
-                    f.write("-" * 40 + "\n")
-                    f.write(f"🎤 Arabic:  {entry['arabic_text']}\n")
-                    f.write(f"🔤 English: {entry['english_text']}\n")
-                    f.write("\n")
+                f.write(f"Audio Device: {self.selected_device['name'] if self.selected_device else 'Unknown'}\n")
+                f.write(f"Total Entries: {self.transcript_count}\n")
             
-            print(f"\n📄 Transcript saved to: {filepath}")
-            print(f"   Total entries: {len(self.transcripts)}")
+            print(f"\n📄 Transcript saved to: {self._transcript_path}")
+            print(f"   Total entries: {self.transcript_count}")
             
         except Exception as e:
             print(f"\n❌ Error saving transcript: {e}")
@@ -602,11 +1346,11 @@ def check_dependencies():
     required_packages = {
         'pyaudio': 'PyAudio',
         'numpy': 'numpy',
-        'speech_recognition': 'SpeechRecognition',
         'transformers': 'transformers',
-        'torch': 'torch',  # Required by transformers
-        'keyboard': 'keyboard'  # For keyboard shortcuts
+        'torch': 'torch'  # Required by transformers
     }
+    if os.environ.get("ASR_BACKEND", "whisper").strip().lower() in GOOGLE_ASR_BACKENDS:
+        required_packages['speech_recognition'] = 'SpeechRecognition'
     
     missing = []
     for module, package in required_packages.items():
@@ -630,10 +1374,11 @@ def select_audio_device(show_saved_device=True):
     print("=" * 50)
     
     # Check for saved device
-    saved_device_name = load_device_config() if show_saved_device else None
+    saved_config = load_device_config() if show_saved_device else {}
+    saved_device_name = saved_config.get("name")
     saved_device = None
     if saved_device_name:
-        saved_device = find_device_by_name(saved_device_name)
+        saved_device = find_saved_device(saved_config)
         if saved_device:
             print(f"\n💾 Saved Default Device: {saved_device['name']}")
             print("   Press ENTER to use saved device, or select a different one below.")
@@ -698,7 +1443,7 @@ def select_audio_device(show_saved_device=True):
                 confirm = input("Confirm selection? (y/n): ").strip().lower()
                 if confirm == 'y':
                     # Save the selected device as default
-                    save_device_config(selected['name'])
+                    save_device_config(selected)
                     return selected
                 else:
                     print("Selection cancelled. Please choose again.")
@@ -746,12 +1491,15 @@ def main():
                 print("\nWithout options, the program will start with interactive device selection")
                 sys.exit(0)
         
+        # Load models in the background while the user picks a device
+        preload_models()
+        
         # Check for saved device first
-        saved_device_name = load_device_config()
+        saved_config = load_device_config()
         selected_device = None
         
-        if saved_device_name:
-            saved_device = find_device_by_name(saved_device_name)
+        if saved_config.get("name"):
+            saved_device = find_saved_device(saved_config)
             if saved_device:
                 print(f"\n💾 Found saved default device: {saved_device['name']}")
                 use_saved = input("Use saved device? (Y/n): ").strip().lower()
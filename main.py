@@ -9,25 +9,44 @@ warnings.filterwarnings("ignore")
 warnings.filterwarnings("ignore", message=r"`return_token_timestamps` is deprecated.*", category=FutureWarning)
 import sys
 import json
+from collections import deque
 from datetime import datetime
 import os
 import atexit
 import configparser
+import importlib.util
+import signal
 import threading
 import queue
 import time
 
-missing_packages = []
+# Thread budget for the models: one core is left for audio capture and the Python threads.
+# ASR and translation run at the same time on separate worker threads, so they split the budget
+# (ASR_THREADS / MT_THREADS) instead of each taking all of it.
+# OpenMP/MKL read these once at import, so they must be set before torch is imported.
+# Fewer threads costs a little peak model throughput but avoids oversubscription stalls in capture.
 try:
-    import keyboard
-except Exception:
-    keyboard = None
-    missing_packages.append("keyboard")
+    MODEL_THREADS = max(1, int(os.environ.get("MODEL_THREADS", str((os.cpu_count() or 1) - 1)).strip()))
+except ValueError:
+    MODEL_THREADS = max(1, (os.cpu_count() or 1) - 1)
+try:
+    MT_THREADS = max(1, int(os.environ.get("MT_THREADS", str(MODEL_THREADS // 2)).strip()))
+except ValueError:
+    MT_THREADS = max(1, MODEL_THREADS // 2)
+try:
+    ASR_THREADS = max(1, int(os.environ.get("ASR_THREADS", str(MODEL_THREADS - MT_THREADS)).strip()))
+except ValueError:
+    ASR_THREADS = max(1, MODEL_THREADS - MT_THREADS)
+# torch runs the Transformers translator (and the Whisper fallback), so it gets the MT share
+os.environ.setdefault("OMP_NUM_THREADS", str(MT_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(MT_THREADS))
+
+missing_packages = []
+# Optional: global hotkeys only (CLI). Also fails without an X/Wayland display on Linux.
 try:
-    import torch
+    from pynput import keyboard as pk
 except Exception:
-    torch = None
-    missing_packages.append("torch")
+    pk = None
 try:
     import soundcard as sc
 except Exception:
@@ -40,15 +59,31 @@ try:
 except Exception:
     np = None
     missing_packages.append("numpy")
+# torch, transformers, faster-whisper and CTranslate2 are imported lazily (see preload_imports):
+# together they cost a second or more, which would otherwise delay the device menu
+torch = None  # set by import_torch()
+_torch_lock = threading.Lock()
+if importlib.util.find_spec("torch") is None:
+    missing_packages.append("torch")
+if importlib.util.find_spec("transformers") is None:
+    missing_packages.append("transformers")
+HAS_FASTER_WHISPER = importlib.util.find_spec("faster_whisper") is not None
+HAS_CTRANSLATE2 = importlib.util.find_spec("ctranslate2") is not None
 try:
-    from transformers import pipeline
+    import soxr
 except Exception:
-    pipeline = None
-    missing_packages.append("transformers")
+    soxr = None
+try:
+    import webrtcvad
+except Exception:
+    webrtcvad = None
 
 # Configuration file path
 CONFIG_FILE = "config.ini"
 
+# Where converted translation models (CTranslate2, ONNX) are cached
+CONVERTED_MODELS_DIR = "models"
+
 def require_dependencies():
     if missing_packages:
         unique = []
@@ -82,6 +117,133 @@ def require_dependencies():
         print("\nInstall:")
         print(f"  pip install {' '.join(extra_missing)}")
 
+def import_torch():
+    """Import torch once (from any thread) and apply the MT_THREADS budget"""
+    global torch
+    with _torch_lock:
+        if torch is None:
+            import torch as torch_module
+            torch_module.set_num_threads(MT_THREADS)
+            try:
+                torch_module.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Already fixed once inter-op work has started
+            torch = torch_module
+    return torch
+
+def preload_imports():
+    """Import the model libraries in a daemon thread so the cost overlaps with device selection"""
+    def do_import():
+        try:
+            import_torch()
+            if HAS_FASTER_WHISPER:
+                import faster_whisper  # noqa: F401
+            if HAS_CTRANSLATE2:
+                import ctranslate2  # noqa: F401
+            from transformers import AutoModelForSeq2SeqLM, AutoTokenizer  # noqa: F401
+        except Exception:
+            pass
+    threading.Thread(target=do_import, daemon=True).start()
+
+def faster_whisper_model_name(model_name):
+    """Map a Hugging Face Whisper id (openai/whisper-small) to a faster-whisper size name (small)"""
+    prefix = "openai/whisper-"
+    if model_name.startswith(prefix):
+        return model_name[len(prefix):]
+    return model_name
+
+def load_faster_whisper(whisper_model, use_cuda=False):
+    """Load faster-whisper (int8 on CPU, int8_float16 on CUDA); downloads the model on first use"""
+    from faster_whisper import WhisperModel
+    return WhisperModel(
+        faster_whisper_model_name(whisper_model),
+        device="cuda" if use_cuda else "cpu",
+        compute_type="int8_float16" if use_cuda else "int8",
+        cpu_threads=ASR_THREADS,
+    )
+
+def ct2_model_dir(model_name):
+    """Local directory for the int8 CTranslate2 conversion of a Hugging Face model"""
+    return os.path.join(CONVERTED_MODELS_DIR, model_name.replace("/", "--") + "-ct2-int8")
+
+def load_ct2_translator(model_name, use_cuda=False):
+    """Load a Marian model with CTranslate2 (int8), converting it once into models/ on first use"""
+    import ctranslate2
+    from transformers import AutoTokenizer
+    output_dir = ct2_model_dir(model_name)
+    if not os.path.exists(os.path.join(output_dir, "model.bin")):
+        print(f"Converting {model_name} to CTranslate2 int8 (first run only)...")
+        converter = ctranslate2.converters.TransformersConverter(model_name)
+        converter.convert(output_dir, quantization="int8", force=True)
+    translator = ctranslate2.Translator(
+        output_dir,
+        device="cuda" if use_cuda else "cpu",
+        compute_type="int8_float16" if use_cuda else "int8",
+        intra_threads=MT_THREADS,
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return translator, tokenizer
+
+def onnx_model_dir(model_name):
+    """Local directory for the ONNX export of a Hugging Face model"""
+    return os.path.join(CONVERTED_MODELS_DIR, model_name.replace("/", "--") + "-onnx")
+
+def load_onnx_translator(model_name):
+    """Load a Marian model with ONNX Runtime (all graph optimizations), exporting it once into models/"""
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+    output_dir = onnx_model_dir(model_name)
+    if not os.path.exists(os.path.join(output_dir, "config.json")):
+        print(f"Exporting {model_name} to ONNX (first run only)...")
+        ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True).save_pretrained(output_dir)
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session_options.intra_op_num_threads = MT_THREADS
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        output_dir,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return model, tokenizer
+
+def load_torch_translator(model_name, torch_device=-1, torch_dtype=None):
+    """Load the translation model and tokenizer directly (no pipeline wrapper), in eval mode"""
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+    model_kwargs = {}
+    if torch_dtype is not None:
+        model_kwargs["torch_dtype"] = torch_dtype
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, **model_kwargs)
+    if torch_device == 0:
+        model = model.to("cuda")
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return model, tokenizer
+
+def compile_translator(model, tokenizer):
+    """Opt-in torch.compile of the translator's forward; restores eager mode if compilation fails"""
+    eager_forward = model.forward
+    try:
+        # Persist compiled graphs on disk so the compile cost is paid once across restarts
+        import torch._inductor.config as inductor_config
+        inductor_config.fx_graph_cache = True
+    except Exception:
+        pass
+    try:
+        if getattr(model, "_supports_static_cache", False):
+            model.generation_config.cache_implementation = "static"
+        model.forward = torch.compile(model.forward, mode="reduce-overhead")
+        # Compilation is lazy; run one generate now so failures surface here rather than mid-session
+        inputs = tokenizer(["مرحبا"], return_tensors="pt").to(model.device)
+        with torch.inference_mode():
+            model.generate(**inputs, num_beams=1, do_sample=False, max_new_tokens=16)
+        print("✅ Translation model compiled.")
+    except Exception as e:
+        model.forward = eager_forward
+        model.generation_config.cache_implementation = None
+        print(f"⚠️ torch.compile unavailable for the translator, using eager mode: {e}")
+
 def load_device_config():
     """Load saved device configuration"""
     config = configparser.ConfigParser()
@@ -99,9 +261,22 @@ def save_device_config(device_name):
         config.write(f)
     print(f"Device '{device_name}' saved as default.")
 
+# Device enumeration (WASAPI on Windows) can take hundreds of ms, so reuse a recent listing
+_devices_cache = None
+_devices_cache_time = 0.0
+
+def get_audio_devices(refresh=False, max_age=5.0):
+    """All microphones including loopback devices, cached for `max_age` seconds unless `refresh`"""
+    global _devices_cache, _devices_cache_time
+    now = time.monotonic()
+    if refresh or _devices_cache is None or now - _devices_cache_time > max_age:
+        _devices_cache = sc.all_microphones(include_loopback=True)
+        _devices_cache_time = now
+    return _devices_cache
+
 def find_device_by_name(device_name):
     """Find audio device by name"""
-    all_devices = sc.all_microphones(include_loopback=True)
+    all_devices = get_audio_devices()
     for device in all_devices:
         if device.name == device_name:
             return device
@@ -117,15 +292,23 @@ class ArabicAudioTranscriber:
         self.on_event = on_event
         self.interactive = interactive
         
-        # Initialize transcript storage
-        self.transcripts = []
+        # Initialize transcript storage; entries are also streamed to a JSONL file as they arrive,
+        # so the in-memory copy is capped to keep marathon sessions at steady memory
+        self.transcripts = deque(maxlen=50000)
         self.session_start_time = datetime.now()
+        self._jsonl = None
+        self._saved = False
+        # Create transcripts/ now so a save at signal time can't fail on it
+        self.transcript_path("txt")
         
-        # Register cleanup function to save transcripts on exit
+        # Register cleanup function to save transcripts on exit (a no-op if already saved)
         atexit.register(self.save_transcript)
+        if self.interactive and threading.current_thread() is threading.main_thread():
+            self.install_signal_handlers()
         
         # Keyboard shortcut flag
         self.device_change_requested = False
+        self._hotkey_listener = None
 
         self.offline_only = os.environ.get("OFFLINE_ONLY", "0").strip() == "1"
         self.asr_language = (asr_language or os.environ.get("ASR_LANGUAGE", "ar-AR")).strip() or "ar-AR"
@@ -141,39 +324,38 @@ class ArabicAudioTranscriber:
             is_loopback = bool(getattr(self.selected_device, "isloopback", False))
             self.capture_sample_rate = 48000 if is_loopback else 16000
 
-        self.torch_device = 0 if (torch and torch.cuda.is_available()) else -1
+        # FORCE_CPU=1 (or --cpu) keeps the models off the GPU, e.g. on laptops with a weak integrated GPU
+        force_cpu = os.environ.get("FORCE_CPU", "0").strip() == "1"
+        import_torch()  # usually already done by preload_imports during device selection
+        self.torch_device = 0 if (torch and torch.cuda.is_available() and not force_cpu) else -1
         self.torch_dtype = torch.float16 if self.torch_device == 0 else None
         if self.torch_device == 0:
             print("✅ GPU detected (CUDA). Using GPU acceleration.")
+        elif force_cpu:
+            print("ℹ️ FORCE_CPU is set. Using CPU.")
         else:
             if torch and "+cpu" in getattr(torch, "__version__", ""):
                 print("⚠️ CUDA not available (CPU-only torch build). Using CPU.")
             else:
                 print("⚠️ CUDA not available. Using CPU.")
 
-        # Initialize offline ASR (Whisper via transformers)
+        # Initialize offline ASR (faster-whisper if installed, else Whisper via transformers)
         self.asr = None
+        self.asr_engine = "faster_whisper" if HAS_FASTER_WHISPER else "transformers"
         whisper_model = os.environ.get("WHISPER_MODEL", "openai/whisper-small").strip()
         print("Loading offline ASR model (Whisper)...")
         if self.offline_only:
             os.environ.setdefault("HF_HUB_OFFLINE", "1")
             os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
         try:
-            asr_kwargs = {
-                "model": whisper_model,
-                "device": self.torch_device,
-            }
-            if self.torch_dtype is not None:
-                asr_kwargs["torch_dtype"] = self.torch_dtype
-            try:
-                self.asr = pipeline("automatic-speech-recognition", **asr_kwargs)
-            except TypeError:
-                asr_kwargs.pop("torch_dtype", None)
-                self.asr = pipeline("automatic-speech-recognition", **asr_kwargs)
-            try:
-                self.asr.feature_extractor.return_attention_mask = True
-            except Exception:
-                pass
+            if self.asr_engine == "faster_whisper":
+                try:
+                    self.asr = load_faster_whisper(whisper_model, use_cuda=(self.torch_device == 0))
+                except ImportError as e:
+                    print(f"⚠️ faster-whisper unavailable, using Transformers: {e}")
+                    self.asr_engine = "transformers"
+            if self.asr is None:
+                self._load_transformers_asr(whisper_model)
             print("✅ Offline ASR ready.")
         except Exception as e:
             print(f"❌ Failed to initialize offline ASR: {e}")
@@ -181,14 +363,35 @@ class ArabicAudioTranscriber:
                 print("💡 Offline-only is enabled. Set OFFLINE_ONLY=0 once to allow the model to download, then rerun.")
             raise
         
-        # Initialize translation pipeline (Helsinki-NLP)
+        # Initialize translation model (Helsinki-NLP)
         print("Loading translation model (this may take a moment on first run)...")
         translation_model_name = (translation_model or os.environ.get("TRANSLATION_MODEL", "Helsinki-NLP/opus-mt-ar-en")).strip()
-        self.translator = pipeline(
-            "translation", 
-            model=translation_model_name,
-            device=self.torch_device
-        )
+        self.translator = None
+        self.translation_tokenizer = None
+        # TRANSLATION_BACKEND: auto (CTranslate2 if installed), ctranslate2, onnx or transformers
+        self.translation_backend = os.environ.get("TRANSLATION_BACKEND", "auto").strip().lower() or "auto"
+        if self.translation_backend == "auto":
+            self.translation_backend = "ctranslate2" if HAS_CTRANSLATE2 else "transformers"
+        try:
+            if self.translation_backend == "ctranslate2":
+                self.translator, self.translation_tokenizer = load_ct2_translator(
+                    translation_model_name, use_cuda=(self.torch_device == 0)
+                )
+            elif self.translation_backend == "onnx":
+                self.translator, self.translation_tokenizer = load_onnx_translator(translation_model_name)
+        except Exception as e:
+            print(f"⚠️ {self.translation_backend} translator unavailable, using Transformers: {e}")
+            self.translator = None
+            self.translation_tokenizer = None
+        if self.translator is None:
+            self.translation_backend = "transformers"
+            self.translator, self.translation_tokenizer = load_torch_translator(
+                translation_model_name, self.torch_device, self.torch_dtype
+            )
+            # TRANSLATION_COMPILE=1 trades a slow first start for cheaper per-token decoding
+            if os.environ.get("TRANSLATION_COMPILE", "0").strip() == "1" and hasattr(torch, "compile"):
+                print("Compiling translation model (first run may take a minute)...")
+                compile_translator(self.translator, self.translation_tokenizer)
         
         # Audio settings
         self.sample_rate = 16000  # 16kHz for speech recognition
@@ -198,15 +401,98 @@ class ArabicAudioTranscriber:
         except Exception:
             self.chunk_duration = float(default_chunk)
         
-        # Threading components
-        self.audio_queue = queue.Queue()
+        # Speech gate at capture time, independent of the level (quiet chunks are boosted before ASR):
+        # WebRTC VAD must find VAD_MIN_VOICED_RATIO of the 30 ms frames voiced (WEBRTC_VAD_MODE 0-3,
+        # -1 disables the gate); without webrtcvad, a chunk must be VAD_NOISE_RATIO x the noise floor
+        try:
+            vad_mode = int(os.environ.get("WEBRTC_VAD_MODE", "2").strip())
+        except Exception:
+            vad_mode = 2
+        self.vad_enabled = vad_mode >= 0
+        self._vad = None
+        if (
+            webrtcvad is not None
+            and 0 <= vad_mode <= 3
+            and self.capture_sample_rate in (8000, 16000, 32000, 48000)
+        ):
+            self._vad = webrtcvad.Vad(vad_mode)
+        try:
+            self.vad_min_voiced_ratio = float(os.environ.get("VAD_MIN_VOICED_RATIO", "0.1").strip())
+        except Exception:
+            self.vad_min_voiced_ratio = 0.1
+        try:
+            self.vad_noise_ratio = float(os.environ.get("VAD_NOISE_RATIO", "2.0").strip())
+        except Exception:
+            self.vad_noise_ratio = 2.0
+        self._noise_floor = None
+        self._vad_pcm = None  # int16 scratch buffer for the VAD
+        
+        # Threading components: capture writes chunks into a fixed ring of slots and bumps
+        # _slot_head; process_audio reads them in order and bumps _slot_tail once done with a slot.
+        # Each index has a single writer, so no lock is needed; the event only wakes the consumer.
+        self.audio_slots = 8
+        self._slots = np.empty((self.audio_slots, int(self.capture_sample_rate * self.chunk_duration)), dtype=np.float32)
+        self._slot_head = 0
+        self._slot_tail = 0
+        self._slot_ready = threading.Event()
+        self._dropped_chunks = 0
+        self.translate_queue = queue.Queue()  # Transcribed text for the translate worker; None ends it
+        self.translate_batch_size = 8  # max waiting texts translated in one call
+        # A chunk's transcript is well under 128 tokens; built once and reused for every call
+        self.translate_max_input_tokens = 128
+        self._tok_kwargs = {
+            "return_tensors": "pt",
+            "truncation": True,
+            "max_length": self.translate_max_input_tokens,
+            "padding": True,
+        }
+        self._gen_kwargs = {"num_beams": 1, "do_sample": False, "max_new_tokens": 256}
         self.running = False
         self._silence_run = 0
         self._last_audio_hint_time = 0.0
         self._debug_counter = 0
+
+        # Run one dummy pass through each model off the main thread so the first real chunk
+        # doesn't pay the cold-start cost; process_audio waits for it before its first use
+        self._warmup_thread = threading.Thread(target=self.warm_up_models, daemon=True)
+        self._warmup_thread.start()
         
         print("Initialization complete!\n")
 
+    def warm_up_models(self):
+        """Run a throwaway translation and transcription to trigger lazy initialization"""
+        try:
+            self.translate_batch(["مرحبا"])
+            silence = np.zeros(self.sample_rate, dtype=np.float32)
+            if self.asr_engine == "faster_whisper":
+                # Skip the VAD filter so the encoder actually runs on the silent buffer
+                segments, _ = self.asr.transcribe(silence, language=(self.whisper_language or "ar"), beam_size=1)
+                list(segments)
+            else:
+                self.recognize_arabic_offline(silence)
+        except Exception as e:
+            if self.audio_debug:
+                print(f"\nModel warm-up failed: {e}")
+
+    def _load_transformers_asr(self, whisper_model):
+        """Fallback ASR when faster-whisper is not installed: Whisper via a transformers pipeline"""
+        from transformers import pipeline
+        asr_kwargs = {
+            "model": whisper_model,
+            "device": self.torch_device,
+        }
+        if self.torch_dtype is not None:
+            asr_kwargs["torch_dtype"] = self.torch_dtype
+        try:
+            self.asr = pipeline("automatic-speech-recognition", **asr_kwargs)
+        except TypeError:
+            asr_kwargs.pop("torch_dtype", None)
+            self.asr = pipeline("automatic-speech-recognition", **asr_kwargs)
+        try:
+            self.asr.feature_extractor.return_attention_mask = True
+        except Exception:
+            pass
+
     def resample_audio(self, audio_array, original_sample_rate, target_sample_rate):
         if original_sample_rate == target_sample_rate:
             return audio_array.astype(np.float32, copy=False)
@@ -217,11 +503,30 @@ class ArabicAudioTranscriber:
         if target_len <= 1:
             return np.asarray([], dtype=np.float32)
         x = audio_array.astype(np.float32, copy=False)
+        if soxr is not None:
+            # libsoxr's band-limited resampler: better quality than linear interpolation, in C
+            return soxr.resample(x, original_sample_rate, target_sample_rate, quality="HQ").astype(np.float32, copy=False)
         original_positions = np.arange(x.shape[0], dtype=np.float64)
         target_positions = np.linspace(0, x.shape[0] - 1, num=target_len, dtype=np.float64)
         y = np.interp(target_positions, original_positions, x).astype(np.float32)
         return y
 
+    def mix_to_mono(self, audio_data, out):
+        """Average the channels of a (frames, channels) chunk in one pass, writing into `out`"""
+        if audio_data.ndim == 1:
+            out[:] = audio_data
+            return out
+        channels = audio_data.shape[1]
+        if channels == 1:
+            out[:] = audio_data[:, 0]
+            return out
+        if channels == 2:
+            np.add(audio_data[:, 0], audio_data[:, 1], out=out)
+        else:
+            np.sum(audio_data, axis=1, out=out)
+        out *= 1.0 / channels
+        return out
+
     def emit(self, event_type, payload=None):
         if callable(self.on_event):
             try:
@@ -229,9 +534,49 @@ class ArabicAudioTranscriber:
             except Exception:
                 pass
 
+    def translate_batch(self, texts):
+        """Translate a list of transcribed strings in one model call, returning results in input order"""
+        # Sort by length so similar-sized inputs share a batch and padding stays small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_texts = [texts[i] for i in order]
+        if self.translation_backend == "onnx":
+            tok = self.translation_tokenizer
+            inputs = tok(sorted_texts, **self._tok_kwargs)
+            generated = self.translator.generate(**inputs, **self._gen_kwargs)
+            outputs = tok.batch_decode(generated, skip_special_tokens=True)
+        elif self.translation_backend == "ctranslate2":
+            tok = self.translation_tokenizer
+            encoded = tok(sorted_texts, truncation=True, max_length=self.translate_max_input_tokens)
+            token_lists = [tok.convert_ids_to_tokens(ids) for ids in encoded.input_ids]
+            results = self.translator.translate_batch(token_lists, beam_size=1, max_decoding_length=256)
+            outputs = [
+                tok.decode(tok.convert_tokens_to_ids(r.hypotheses[0]), skip_special_tokens=True)
+                for r in results
+            ]
+        else:
+            tok = self.translation_tokenizer
+            inputs = tok(sorted_texts, **self._tok_kwargs).to(self.translator.device)
+            # inference_mode skips autograd bookkeeping entirely (cheaper than no_grad)
+            with torch.inference_mode():
+                generated = self.translator.generate(**inputs, **self._gen_kwargs)
+            outputs = tok.batch_decode(generated, skip_special_tokens=True)
+        english_texts = [""] * len(texts)
+        for i, text in zip(order, outputs):
+            english_texts[i] = text
+        return english_texts
+
     def recognize_arabic_offline(self, audio_array):
         if not self.asr:
             raise RuntimeError("Offline ASR is not initialized")
+        if self.asr_engine == "faster_whisper":
+            # faster-whisper consumes 16 kHz float32 directly; beam_size=1 keeps decoding greedy
+            segments, _ = self.asr.transcribe(
+                audio_array.astype(np.float32, copy=False),
+                language=(self.whisper_language or "ar"),
+                beam_size=1,
+                vad_filter=True,
+            )
+            return " ".join(seg.text.strip() for seg in segments).strip()
         result = self.asr(
             {"array": audio_array.astype(np.float32), "sampling_rate": self.sample_rate},
             generate_kwargs={"task": "transcribe", "language": (self.whisper_language or "ar")},
@@ -248,7 +593,7 @@ class ArabicAudioTranscriber:
             return ""
     
     def capture_audio(self):
-        """Continuously capture audio from selected device and add to queue"""
+        """Continuously capture audio from selected device into the slot ring"""
         try:
             if self.selected_device is None:
                 raise RuntimeError("No audio device selected")
@@ -261,133 +606,237 @@ class ArabicAudioTranscriber:
             
             # Open recorder for the selected device
             with self.selected_device.recorder(samplerate=self.capture_sample_rate) as mic:
+                chunk_size = self._slots.shape[1]
                 while self.running:
                     # Capture audio chunk
-                    chunk_size = int(self.capture_sample_rate * self.chunk_duration)
                     audio_data = mic.record(numframes=chunk_size)
+
+                    # All slots still waiting for ASR: drop this chunk rather than overwrite one
+                    head = self._slot_head
+                    if head - self._slot_tail >= self.audio_slots:
+                        self._dropped_chunks += 1
+                        if self._dropped_chunks == 1 or self._dropped_chunks % 10 == 0:
+                            print(f"\n⚠️ Transcription is falling behind, dropped chunk ({self._dropped_chunks} total)")
+                        continue
+                    
+                    # Convert stereo to mono straight into the next free slot
+                    slot = self.mix_to_mono(audio_data, self._slots[head % self.audio_slots])
                     
-                    # Convert stereo to mono if necessary
-                    if len(audio_data.shape) > 1:
-                        audio_data = np.mean(audio_data, axis=1)
+                    # Skip silent chunks before they reach ASR and translation
+                    if self.is_silent_chunk(slot):
+                        continue
                     
-                    # Add to queue for processing
-                    self.audio_queue.put((audio_data, self.capture_sample_rate))
+                    # Publish the slot to process_audio
+                    self._slot_head = head + 1
+                    self._slot_ready.set()
                     
         except Exception as e:
             print(f"\nError capturing audio: {e}")
             self.running = False
     
+    def is_silent_chunk(self, audio_data):
+        """Speech gate run at capture time: True if the chunk is silent or has no speech"""
+        if not audio_data.size:
+            rms = peak = 0.0
+        else:
+            rms = float(np.sqrt(np.dot(audio_data, audio_data) / audio_data.size))
+            peak = float(np.max(np.abs(audio_data)))
+        digital_silence = rms < 0.0000005 and peak < 0.000001
+        if not digital_silence and (not self.vad_enabled or self.has_speech(audio_data, rms, peak)):
+            self._silence_run = 0
+            return False
+
+        # A run of digitally silent chunks usually means the wrong device or a permissions problem
+        if digital_silence:
+            self._silence_run += 1
+            if self._silence_run >= 5 and (time.time() - self._last_audio_hint_time) > 10:
+                device_name = getattr(self.selected_device, "name", "<unknown>")
+                loopback_hint = ""
+                if getattr(self.selected_device, "isloopback", False):
+                    loopback_hint = " If this is a loopback device, ensure audio is playing through that output and try CAPTURE_SAMPLE_RATE=48000."
+                print(
+                    f"\nNo audio detected from '{device_name}'. "
+                    f"Select the correct device and ensure Windows microphone permission is enabled.{loopback_hint}"
+                )
+                self._last_audio_hint_time = time.time()
+        else:
+            self._silence_run = 0
+        return True
+
+    def has_speech(self, audio_data, rms, peak):
+        """Level-independent speech check: WebRTC VAD voiced-frame ratio, else energy above the noise floor"""
+        if self._vad is not None:
+            # Run the VAD on the audio as ASR will get it: boosted like transcribe_chunk, as 16-bit PCM
+            if self._vad_pcm is None or self._vad_pcm.shape[0] != audio_data.shape[0]:
+                self._vad_pcm = np.empty(audio_data.shape[0], dtype=np.int16)
+            scaled = np.clip(audio_data * (self.quiet_gain(peak) * 32767.0), -32768.0, 32767.0)
+            np.copyto(self._vad_pcm, scaled, casting="unsafe")
+            pcm = self._vad_pcm.tobytes()
+            rate = self.capture_sample_rate
+            frame_bytes = (rate * 30 // 1000) * 2
+            frame_count = len(pcm) // frame_bytes
+            if frame_count == 0:
+                return True
+            voiced = 0
+            for i in range(frame_count):
+                if self._vad.is_speech(pcm[i * frame_bytes:(i + 1) * frame_bytes], rate):
+                    voiced += 1
+            return voiced >= self.vad_min_voiced_ratio * frame_count
+
+        # The noise floor drops to any quieter chunk at once and rises slowly, so a steady hum or
+        # music bed settles into it and stops passing while speech stays well above it
+        floor = self._noise_floor
+        if floor is None:
+            self._noise_floor = rms
+            return True
+        if rms < floor:
+            self._noise_floor = rms
+            return False
+        self._noise_floor = floor + (rms - floor) * 0.05
+        return rms >= floor * self.vad_noise_ratio
+
+    def quiet_gain(self, peak):
+        """Gain applied to quiet chunks (peak below 0.05) before ASR, capped at 200x"""
+        if 0 < peak < 0.05:
+            return min(200.0, 0.9 / peak)
+        return 1.0
+
+    def transcribe_chunk(self, audio_data, capture_sr):
+        """Resample, level-check and transcribe one captured chunk"""
+        if capture_sr != self.sample_rate:
+            audio_data = self.resample_audio(audio_data, capture_sr, self.sample_rate)
+
+        # Transcribe Arabic audio
+        print("Listening...", end="\r")
+        peak = float(np.max(np.abs(audio_data))) if audio_data.size else 0.0
+
+        if self.audio_debug:
+            self._debug_counter += 1
+            if self._debug_counter % 10 == 0:
+                rms = float(np.sqrt(np.mean(np.square(audio_data)))) if audio_data.size else 0.0
+                print(f"\nAudio level: peak={peak:.6f} rms={rms:.6f}")
+
+        gain = self.quiet_gain(peak)
+        if gain != 1.0:
+            audio_data = audio_data * gain
+        started = time.time()
+        print("Transcribing (offline Whisper)...", end="\r")
+        self.emit("status", "transcribing")
+        arabic_text = self.recognize_arabic_offline(audio_data)
+
+        elapsed = time.time() - started
+        if elapsed > 2.0 and self.audio_debug:
+            print(f"\nASR time: {elapsed:.1f}s")
+        return arabic_text
+
     def process_audio(self):
-        """Process audio chunks from queue: transcribe and translate"""
-        while self.running or not self.audio_queue.empty():
-            try:
-                # Get audio chunk from queue (timeout prevents hanging)
-                item = self.audio_queue.get(timeout=1)
-                if isinstance(item, tuple) and len(item) == 2:
-                    audio_data, capture_sr = item
-                else:
-                    audio_data, capture_sr = item, self.sample_rate
-                if capture_sr != self.sample_rate:
-                    audio_data = self.resample_audio(audio_data, capture_sr, self.sample_rate)
-                
+        """Transcribe audio chunks from the slot ring and hand the text to the translate worker"""
+        self._warmup_thread.join()
+        try:
+            while self.running or self._slot_tail < self._slot_head:
                 try:
-                    # Transcribe Arabic audio
-                    print("Listening...", end="\r")
-                    peak = float(np.max(np.abs(audio_data))) if audio_data.size else 0.0
-                    rms = float(np.sqrt(np.mean(np.square(audio_data)))) if audio_data.size else 0.0
-
-                    if self.audio_debug:
-                        self._debug_counter += 1
-                        if self._debug_counter % 10 == 0:
-                            print(f"\nAudio level: peak={peak:.6f} rms={rms:.6f}")
-
-                    if peak < 0.000001 and rms < 0.0000005:
-                        self._silence_run += 1
-                        if self._silence_run >= 5 and (time.time() - self._last_audio_hint_time) > 10:
-                            device_name = getattr(self.selected_device, "name", "<unknown>")
-                            loopback_hint = ""
-                            if getattr(self.selected_device, "isloopback", False):
-                                loopback_hint = " If this is a loopback device, ensure audio is playing through that output and try CAPTURE_SAMPLE_RATE=48000."
-                            print(
-                                f"\nNo audio detected from '{device_name}'. "
-                                f"Select the correct device and ensure Windows microphone permission is enabled.{loopback_hint}"
-                            )
-                            self._last_audio_hint_time = time.time()
+                    # Wait for capture to publish a slot (timeout prevents hanging)
+                    if self._slot_tail == self._slot_head:
+                        self._slot_ready.wait(timeout=1)
+                        self._slot_ready.clear()
                         continue
 
-                    self._silence_run = 0
-
-                    if peak > 0 and peak < 0.05:
-                        gain = min(200.0, 0.9 / peak)
-                        audio_data = audio_data * gain
-                    started = time.time()
-                    print("Transcribing (offline Whisper)...", end="\r")
-                    self.emit("status", "transcribing")
-                    arabic_text = self.recognize_arabic_offline(audio_data)
-
-                    elapsed = time.time() - started
-                    if elapsed > 2.0 and self.audio_debug:
-                        print(f"\nASR time: {elapsed:.1f}s")
-                    
+                    slot = self._slots[self._slot_tail % self.audio_slots]
+                    try:
+                        arabic_text = self.transcribe_chunk(slot, self.capture_sample_rate)
+                    except Exception as e:
+                        hint = ""
+                        if self.offline_only:
+                            hint = " (set OFFLINE_ONLY=0 to allow first-time model download)"
+                        self.emit("error", f"{e}{hint}")
+                        print(f"\nOffline ASR error: {e}{hint}")
+                        continue
+                    finally:
+                        # ASR is done with the slot; hand it back to capture
+                        self._slot_tail += 1
                     if arabic_text:
                         self.emit("arabic", arabic_text)
                         print(f"\n🎤 Arabic: {arabic_text}")
-                        
-                        # Translate to English
-                        self.emit("status", "translating")
-                        translation = self.translator(
-                            arabic_text,
-                            max_length=512,
-                            truncation=True
-                        )
-                        english_text = translation[0]['translation_text']
-                        self.emit("english", english_text)
-                        print(f"🔤 English: {english_text}")
-                        print("-" * 50)
-                        
-                        # Store transcript entry
-                        transcript_entry = {
-                            'timestamp': datetime.now().isoformat(),
-                            'arabic_text': arabic_text,
-                            'english_text': english_text
-                        }
-                        self.transcripts.append(transcript_entry)
-                        self.emit("transcript", transcript_entry)
+                        self.translate_queue.put(arabic_text)
                     
                 except Exception as e:
-                    hint = ""
-                    if self.offline_only:
-                        hint = " (set OFFLINE_ONLY=0 to allow first-time model download)"
-                    self.emit("error", f"{e}{hint}")
-                    print(f"\nOffline ASR error: {e}{hint}")
-                    continue
-                
-            except queue.Empty:
-                continue
+                    print(f"\nError processing audio: {e}")
+        finally:
+            # Tell the translate worker no more text is coming
+            self.translate_queue.put(None)
+
+    def translate_text(self):
+        """Translate transcribed text while the next chunk is being transcribed"""
+        finished = False
+        while not finished:
+            arabic_text = self.translate_queue.get()
+            if arabic_text is None:
+                break
+
+            # Take everything else already waiting so it is translated in the same call
+            arabic_texts = [arabic_text]
+            while len(arabic_texts) < self.translate_batch_size:
+                try:
+                    arabic_text = self.translate_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if arabic_text is None:
+                    finished = True
+                    break
+                arabic_texts.append(arabic_text)
+
+            try:
+                # Translate to English
+                self.emit("status", "translating")
+                english_texts = self.translate_batch(arabic_texts)
             except Exception as e:
-                print(f"\nError processing audio: {e}")
+                self.emit("error", f"{e}")
+                print(f"\nTranslation error: {e}")
+                continue
+
+            for arabic_text, english_text in zip(arabic_texts, english_texts):
+                self.emit("english", english_text)
+                print(f"🔤 English: {english_text}")
+                print("-" * 50)
+                
+                # Store transcript entry
+                transcript_entry = {
+                    'timestamp': datetime.now(),
+                    'arabic_text': arabic_text,
+                    'english_text': english_text
+                }
+                self.transcripts.append(transcript_entry)
+                self.append_transcript_jsonl(transcript_entry)
+                self.emit("transcript", transcript_entry)
 
     def start_background(self, enable_keyboard_shortcuts=False):
-        if self.running:
+        # run() sets `running` before starting the workers, so check for live workers instead
+        process_thread = getattr(self, "_process_thread", None)
+        if self.running and process_thread is not None and process_thread.is_alive():
             return
         self.running = True
         if enable_keyboard_shortcuts and self.interactive:
             self.setup_keyboard_shortcuts()
         self._capture_thread = threading.Thread(target=self.capture_audio, daemon=True)
         self._process_thread = threading.Thread(target=self.process_audio, daemon=True)
+        self._translate_thread = threading.Thread(target=self.translate_text, daemon=True)
         self._capture_thread.start()
         self._process_thread.start()
+        self._translate_thread.start()
 
     def stop_background(self):
         self.running = False
 
-    def join_background(self, timeout_capture=2, timeout_process=5):
+    def join_background(self, timeout_capture=2, timeout_process=5, timeout_translate=5):
         t1 = getattr(self, "_capture_thread", None)
         t2 = getattr(self, "_process_thread", None)
+        t3 = getattr(self, "_translate_thread", None)
         if t1:
             t1.join(timeout=timeout_capture)
         if t2:
             t2.join(timeout=timeout_process)
+        if t3:
+            t3.join(timeout=timeout_translate)
     
     def run(self):
         """Main run loop with threading for simultaneous capture and processing"""
@@ -411,7 +860,7 @@ class ArabicAudioTranscriber:
                 self.running = False
             
             # Wait for threads to finish
-            self.join_background(timeout_capture=2, timeout_process=5)
+            self.join_background(timeout_capture=2, timeout_process=5, timeout_translate=5)
             
             # Handle device change request
             if self.device_change_requested:
@@ -435,23 +884,35 @@ class ArabicAudioTranscriber:
                 # Normal exit
                 break
         
-        # Save transcript before stopping
+        # Stop the hotkey listener and save transcript before stopping
+        self.stop_keyboard_shortcuts()
         self.save_transcript()
         print("Transcription stopped.")
     
     def setup_keyboard_shortcuts(self):
         """Setup keyboard shortcuts for device selection"""
-        if not keyboard:
+        if self._hotkey_listener is not None:
+            return
+        if not pk:
+            print("\n⚠️ Keyboard shortcuts unavailable (pynput not installed or no display). Ctrl+C still stops transcription.")
             return
         def on_device_change():
             self.device_change_requested = True
             print("\n🔄 Device change requested. Press Ctrl+C to stop current session and change device.")
         
-        # Register Ctrl+D for device change
-        keyboard.add_hotkey('ctrl+d', on_device_change)
+        # Register Ctrl+D for device change; pynput is driven by OS input callbacks, not polling
+        self._hotkey_listener = pk.GlobalHotKeys({'<ctrl>+d': on_device_change})
+        self._hotkey_listener.daemon = True
+        self._hotkey_listener.start()
         print("\n⌨️  Keyboard shortcuts:")
         print("   Ctrl+D: Change audio device")
         print("   Ctrl+C: Stop transcription")
+
+    def stop_keyboard_shortcuts(self):
+        """Stop the global hotkey listener started by setup_keyboard_shortcuts"""
+        if self._hotkey_listener is not None:
+            self._hotkey_listener.stop()
+            self._hotkey_listener = None
     
     def change_device_interactive(self):
         """Interactive device change during runtime"""
@@ -469,25 +930,66 @@ class ArabicAudioTranscriber:
             print("\n❌ Device change cancelled.")
             return False
     
+    def transcript_path(self, extension):
+        """Path of this session's transcript file with the given extension, creating transcripts/"""
+        transcript_dir = "transcripts"
+        if not os.path.exists(transcript_dir):
+            os.makedirs(transcript_dir)
+        timestamp = self.session_start_time.strftime("%Y%m%d_%H%M%S")
+        return os.path.join(transcript_dir, f"transcript_{timestamp}.{extension}")
+
+    def append_transcript_jsonl(self, entry):
+        """Append one entry to the session's JSONL stream so it survives a crash"""
+        if self._saved:
+            # The session has been saved and the stream closed; don't reopen it
+            return
+        try:
+            if self._jsonl is None:
+                # Line-buffered: every entry reaches the OS as soon as it is written
+                self._jsonl = open(self.transcript_path("jsonl"), "a", encoding="utf-8", buffering=1)
+            record = dict(entry, timestamp=entry['timestamp'].isoformat())
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"\n❌ Error writing transcript: {e}")
+
+    def install_signal_handlers(self):
+        """CLI only: Ctrl+C stops the session cleanly; SIGTERM saves and exits"""
+        def on_sigint(signum, frame):
+            if not self.running:
+                # Not transcribing (e.g. at a prompt): behave like the default handler
+                raise KeyboardInterrupt
+            print("\n\nStopping transcription...")
+            self.running = False
+
+        def on_sigterm(signum, frame):
+            self.running = False
+            self.save_transcript()
+            # Exit rather than resume: a resumed session could no longer be saved
+            raise SystemExit(128 + signum)
+
+        signal.signal(signal.SIGINT, on_sigint)
+        signal.signal(signal.SIGTERM, on_sigterm)
+
     def save_transcript(self):
-        """Save all transcripts to a text file"""
-        if not self.transcripts:
+        """Close the JSONL stream and export all transcripts to a readable text file (once per session)"""
+        if self._saved:
+            return
+        self._saved = True
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+        # Snapshot: the translate worker may still be appending if a join timed out,
+        # and iterating a deque while it is mutated raises RuntimeError
+        entries = list(self.transcripts)
+        if not entries:
             print("No transcripts to save.")
             return
         
         try:
-            # Create transcripts directory if it doesn't exist
-            transcript_dir = "transcripts"
-            if not os.path.exists(transcript_dir):
-                os.makedirs(transcript_dir)
-            
-            # Generate filename with timestamp
-            timestamp = self.session_start_time.strftime("%Y%m%d_%H%M%S")
-            filename = f"transcript_{timestamp}.txt"
-            filepath = os.path.join(transcript_dir, filename)
+            filepath = self.transcript_path("txt")
             
             # Save to text file
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with open(filepath, 'w', encoding='utf-8', buffering=8192) as f:
                 # Write session header
                 f.write("=" * 60 + "\n")
                 f.write("ARABIC AUDIO TRANSCRIPTION SESSION\n")
@@ -495,12 +997,12 @@ class ArabicAudioTranscriber:
                 f.write(f"Session Start: {self.session_start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Session End: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Audio Device: {self.selected_device.name if self.selected_device else 'Unknown'}\n")
-                f.write(f"Total Entries: {len(self.transcripts)}\n")
+                f.write(f"Total Entries: {len(entries)}\n")
                 f.write("=" * 60 + "\n\n")
                 
                 # Write each transcript entry
-                for i, entry in enumerate(self.transcripts, 1):
-                    entry_time = datetime.fromisoformat(entry['timestamp']).strftime('%H:%M:%S')
+                for i, entry in enumerate(entries, 1):
+                    entry_time = entry['timestamp'].strftime('%H:%M:%S')
                     f.write(f"[{i:03d}] {entry_time}\n")
                     f.write("-" * 40 + "\n")
                     f.write(f"🎤 Arabic:  {entry['arabic_text']}\n")
@@ -508,12 +1010,12 @@ class ArabicAudioTranscriber:
                     f.write("\n")
             
             print(f"\n📄 Transcript saved to: {filepath}")
-            print(f"   Total entries: {len(self.transcripts)}")
+            print(f"   Total entries: {len(entries)}")
             
         except Exception as e:
             print(f"\n❌ Error saving transcript: {e}")
 
-def select_audio_device(show_saved_device=True):
+def select_audio_device(show_saved_device=True, refresh_devices=False):
     """Interactive device selector"""
     print("\n" + "=" * 50)
     print("AUDIO DEVICE SELECTION")
@@ -531,7 +1033,7 @@ def select_audio_device(show_saved_device=True):
             print(f"\n⚠️  Saved device '{saved_device_name}' not found. Please select a new device.")
     
     # Get all available microphones including loopback devices
-    all_devices = sc.all_microphones(include_loopback=True)
+    all_devices = get_audio_devices(refresh=refresh_devices)
     
     if not all_devices:
         print("No audio devices found!")
@@ -590,6 +1092,7 @@ def select_audio_device(show_saved_device=True):
     print("  • For desktop audio (YouTube, music, etc.), choose a loopback device")
     print("  • For microphone input, choose a microphone device")
     print("  • Enter 0 to try auto-detect desktop audio")
+    print("  • Enter R to rescan devices")
     print("  • Enter Q to quit")
     print("=" * 50)
     
@@ -601,6 +1104,9 @@ def select_audio_device(show_saved_device=True):
             if choice.upper() == 'Q':
                 return None
             
+            if choice.upper() == 'R':
+                return select_audio_device(show_saved_device, refresh_devices=True)
+            
             # Handle ENTER for saved device
             if choice == "" and saved_device:
                 print(f"\nUsing saved device: {saved_device.name}")
@@ -658,10 +1164,17 @@ def main():
     require_dependencies()
     
     if len(sys.argv) > 1 and sys.argv[1] == "--help":
-        print("\nUsage: python main.py")
+        print("\nUsage: python main.py [--cpu]")
         print("\nCommand-line mode (device selection in terminal).")
         print("GUI mode is available via gui.py.")
+        print("\nOptions:")
+        print("  --cpu           Run the models on CPU even if CUDA is available (same as FORCE_CPU=1)")
         sys.exit(0)
+    if "--cpu" in sys.argv[1:]:
+        os.environ["FORCE_CPU"] = "1"
+    
+    # Start importing transformers while the user picks a device
+    preload_imports()
     
     try:
         # Check for saved device first